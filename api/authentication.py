@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api.models import User
+
+USER_CACHE_KEY_TEMPLATE = 'jwt_user:{}'
+# Model.from_db expects values in concrete field order
+CACHED_USER_FIELDS = tuple(field.attname for field in User._meta.concrete_fields
+                           if field.attname in {'id', 'username', 'role', 'is_active'})
+
+
+def invalidate_cached_user(user_id):
+    """Deletes the cached user now and once more on commit, a request in between may cache the old row again"""
+    key = USER_CACHE_KEY_TEMPLATE.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Resolves token user from a short lived cache of id, username, role and active status
+
+    Returned user has the other fields deferred, they are loaded from the database on first access.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        key = USER_CACHE_KEY_TEMPLATE.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            # A lagging replica could put back the role changed by the write that deleted this key
+            values = User.objects.using(DEFAULT_DB_ALIAS).filter(**{api_settings.USER_ID_FIELD: user_id}).values_list(
+                *CACHED_USER_FIELDS).first()
+            if values is None:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+
+        user = User.from_db(DEFAULT_DB_ALIAS, CACHED_USER_FIELDS, values)
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
@@ -0,0 +1,179 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from api.generations import get_generation, increment_generation
+from api.models import Title
+
+TITLE_NAMES = 'title_names'
+PREFIX_END = chr(0x10FFFF)
+# Wider prefix ranges are answered by walking titles in popularity order instead of ranking the whole range
+RANGE_SCAN_LIMIT = 5000
+
+
+def normalize(name):
+    return name.casefold()
+
+
+class TitleNameIndex:
+    """Process-local sorted array of (normalized name, id) for prefix lookups ranked by review count
+
+    Narrow prefixes rank their slice of the array, wide ones take the first matches of a popularity
+    ordered array, so both stay cheap. Local title and review count changes are patched into both
+    arrays on commit. Changes from other processes bump the shared generation, then a background
+    thread reloads the index while lookups keep answering from the previous one. All state lives in
+    one snapshot tuple that is replaced, never modified, so a lookup reads a consistent set of arrays.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (version, loaded at, keys, ranks, names, by popularity), keys[i] is (normalized name, id) and
+        # ranks[i] is its (review count, -id), by popularity holds (-review count, id, normalized name)
+        self._snapshot = None
+        self._epoch = 0
+        self._reloading = False
+        self._reload_thread = None
+        self._dirty_ids = set()
+
+    def _load(self, version, epoch):
+        # The index is stored under the primary's generation, so rows must come from the primary too
+        titles = Title.objects.using(DEFAULT_DB_ALIAS).values_list('id', 'name', 'review_count')
+        rows = sorted((normalize(name), pk, name, review_count) for pk, name, review_count in titles)
+        snapshot = (
+            version,
+            time.monotonic(),
+            [(normalized, pk) for normalized, pk, _, _ in rows],
+            [(review_count, -pk) for _, pk, _, review_count in rows],
+            {pk: name for _, pk, name, _ in rows},
+            sorted((-review_count, pk, normalized) for normalized, pk, _, review_count in rows),
+        )
+        with self._lock:
+            # reset() in between means the rows may come from a database that is gone
+            if epoch == self._epoch:
+                self._snapshot = snapshot
+        return snapshot
+
+    def _reload(self, epoch):
+        try:
+            self._load(get_generation(TITLE_NAMES), epoch)
+        finally:
+            self._reloading = False
+            connection.close()
+
+    def _reload_in_background(self):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+            self._reload_thread = threading.Thread(target=self._reload, args=(self._epoch,), daemon=True)
+        self._reload_thread.start()
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Nothing to answer from yet, the first lookup waits for the load
+            return self._load(get_generation(TITLE_NAMES), self._epoch)
+        version, loaded_at = snapshot[:2]
+        expired = time.monotonic() - loaded_at > settings.AUTOCOMPLETE_REFRESH_SECONDS
+        if expired or version != get_generation(TITLE_NAMES):
+            self._reload_in_background()
+        return snapshot
+
+    def lookup(self, prefix, limit):
+        """Returns up to limit (id, name) pairs of titles whose name starts with prefix, most reviewed first"""
+        _, _, keys, ranks, names, by_popularity = self._get_snapshot()
+        prefix = normalize(prefix)
+        start = bisect_left(keys, (prefix,))
+        end = bisect_left(keys, (prefix + PREFIX_END,), start)
+        if end - start <= RANGE_SCAN_LIMIT:
+            top = [-negative_pk for _, negative_pk in heapq.nlargest(limit, ranks[start:end])]
+        else:
+            matches = (pk for _, pk, normalized in by_popularity if normalized.startswith(prefix))
+            top = list(islice(matches, limit))
+        return [(pk, names[pk]) for pk in top]
+
+    @staticmethod
+    def _remove(keys, ranks, by_popularity, key):
+        position = bisect_left(keys, key)
+        review_count, _ = ranks[position]
+        del keys[position]
+        del ranks[position]
+        normalized, pk = key
+        del by_popularity[bisect_left(by_popularity, (-review_count, pk, normalized))]
+
+    @staticmethod
+    def _insert(keys, ranks, by_popularity, key, review_count):
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        normalized, pk = key
+        ranks.insert(position, (review_count, -pk))
+        insort(by_popularity, (-review_count, pk, normalized))
+
+    def _apply(self, pk, name=None, review_count=0):
+        version = increment_generation(TITLE_NAMES)
+        with self._lock:
+            if self._snapshot is None:
+                return
+            expected, loaded_at, keys, ranks, names, by_popularity = self._snapshot
+            # A counter that moved by more than one means changes from elsewhere, the next lookup reloads
+            if version != expected + 1:
+                return
+            keys, ranks, names, by_popularity = list(keys), list(ranks), dict(names), list(by_popularity)
+            previous = names.pop(pk, None)
+            if previous is not None:
+                self._remove(keys, ranks, by_popularity, (normalize(previous), pk))
+            if name is not None:
+                self._insert(keys, ranks, by_popularity, (normalize(name), pk), review_count)
+                names[pk] = name
+            self._snapshot = (version, loaded_at, keys, ranks, names, by_popularity)
+
+    def _apply_review_counts(self):
+        with self._lock:
+            dirty_ids, self._dirty_ids = self._dirty_ids, set()
+        if not dirty_ids or self._snapshot is None:
+            return
+        titles = Title.objects.using(DEFAULT_DB_ALIAS).filter(id__in=dirty_ids)
+        rows = list(titles.values_list('id', 'review_count'))
+        with self._lock:
+            if self._snapshot is None:
+                return
+            version, loaded_at, keys, ranks, names, by_popularity = self._snapshot
+            keys, ranks, by_popularity = list(keys), list(ranks), list(by_popularity)
+            for pk, review_count in rows:
+                if pk in names:
+                    key = (normalize(names[pk]), pk)
+                    self._remove(keys, ranks, by_popularity, key)
+                    self._insert(keys, ranks, by_popularity, key, review_count)
+            self._snapshot = (version, loaded_at, keys, ranks, names, by_popularity)
+
+    def title_saved(self, title):
+        transaction.on_commit(lambda: self._apply(title.pk, title.name, title.review_count))
+
+    def title_deleted(self, pk):
+        transaction.on_commit(lambda: self._apply(pk))
+
+    def ratings_changed(self, title_ids):
+        if title_ids is None:
+            transaction.on_commit(self.invalidate)
+            return
+        with self._lock:
+            self._dirty_ids.update(title_ids)
+        transaction.on_commit(self._apply_review_counts)
+
+    def invalidate(self):
+        increment_generation(TITLE_NAMES)
+
+    def reset(self):
+        """Drops the local index, the next lookup loads it again"""
+        with self._lock:
+            self._epoch += 1
+            self._snapshot = None
+            self._dirty_ids = set()
+
+
+title_name_index = TitleNameIndex()
@@ -1,21 +1,22 @@
+from random import random
 from uuid import uuid4
 
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.core.mail import send_mail as send_ml
 from django.core.validators import validate_email
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from api.errors import EmailNotValid
-from api.models import EmailCode, Review, User
+from api.models import EmailCode, User
+from api.outbox import enqueue_email
 from api_yamdb import settings
 
 
 def send_email(subject: str, content: str, email: str):
     try:
         validate_email(email)
-        send_ml(subject, content, settings.EMAIL_HOST_USER, [email])
     except ValidationError:
         raise EmailNotValid
+    enqueue_email(subject, content, settings.EMAIL_HOST_USER, email)
 
 
 def generate_code():
@@ -25,18 +26,19 @@ def generate_code():
 def send_code_to_user_and_save_it(user_email: str):
     code = generate_code()
     send_email('Registration code', f'Your code is {code}', user_email)
-    email_code_object, created = EmailCode.objects.get_or_create(email=user_email)
-    email_code_object.code = code
-    email_code_object.save()
+    EmailCode.objects.upsert(user_email, code)
+    if random() < settings.EMAIL_CODE_PURGE_PROBABILITY:
+        purge_expired_email_codes()
 
 
-def user_already_has_review_on_title(author, title):
-    return Review.objects.filter(author=author, title=title).exists()
+def purge_expired_email_codes():
+    deleted, _ = EmailCode.objects.expired().delete()
+    return deleted
 
 
 def get_code_if_email_was_sent_else_none(email):
     try:
-        email_code_object = EmailCode.objects.get(email=email)
+        email_code_object = EmailCode.objects.active().get(email=email)
     except ObjectDoesNotExist:
         return None
     return email_code_object.code
@@ -0,0 +1,89 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from api.generations import get_generation, bump_generation
+from api.models import Category, Genre
+
+
+class CatalogCache:
+    """Process-local copy of a small slug table, reloaded when the shared version counter changes
+
+    The counter is read at most once per CATALOG_VERSION_CHECK_SECONDS, so resolving every row of a page does not
+    make a cache round trip each. The snapshot also expires after CATALOG_CACHE_TIMEOUT seconds, which bounds
+    how long a process serves stale rows when the version counter is not shared between processes.
+    """
+    VERSION_RESOURCE_TEMPLATE = 'catalog:{}'
+
+    def __init__(self, model):
+        self.model = model
+        self.version_resource = self.VERSION_RESOURCE_TEMPLATE.format(model._meta.label_lower)
+        self._snapshot = (None, 0, {}, {})
+        self._next_version_check = 0
+
+    def _get_version(self):
+        return get_generation(self.version_resource)
+
+    def _load(self, version):
+        # Never a replica, rows older than the version would stay cached until the next change
+        objects = list(self.model.objects.using(DEFAULT_DB_ALIAS))
+        expires_at = time.monotonic() + settings.CATALOG_CACHE_TIMEOUT
+        snapshot = (version, expires_at, {obj.pk: obj for obj in objects}, {obj.slug: obj for obj in objects})
+        self._snapshot = snapshot
+        return snapshot
+
+    def _get_snapshot(self, force_reload=False):
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if not force_reload and now < self._next_version_check and now <= snapshot[1]:
+            return snapshot
+        version = self._get_version()
+        self._next_version_check = now + settings.CATALOG_VERSION_CHECK_SECONDS
+        if force_reload or snapshot[0] != version or snapshot[1] < now:
+            snapshot = self._load(version)
+        return snapshot
+
+    def get_by_id(self, pk):
+        _, _, by_id, _ = self._get_snapshot()
+        if pk not in by_id:
+            _, _, by_id, _ = self._get_snapshot(force_reload=True)
+        return by_id.get(pk)
+
+    def get_many_by_ids(self, ids):
+        """Returns found objects by id, misses cause one reload in case local copy is behind the database"""
+        _, _, by_id, _ = self._get_snapshot()
+        if any(pk not in by_id for pk in ids):
+            _, _, by_id, _ = self._get_snapshot(force_reload=True)
+        return {pk: by_id[pk] for pk in ids if pk in by_id}
+
+    def get_by_slug(self, slug):
+        return self.get_many_by_slugs([slug]).get(slug)
+
+    def get_many_by_slugs(self, slugs):
+        """Returns found objects by slug, misses cause one reload in case local copy is behind the database"""
+        _, _, _, by_slug = self._get_snapshot()
+        if any(slug not in by_slug for slug in slugs):
+            _, _, _, by_slug = self._get_snapshot(force_reload=True)
+        return {slug: by_slug[slug] for slug in slugs if slug in by_slug}
+
+    def invalidate(self):
+        self._snapshot = (None, 0, {}, {})
+        bump_generation(self.version_resource)
+
+
+category_cache = CatalogCache(Category)
+genre_cache = CatalogCache(Genre)
+
+CATALOG_CACHES = {
+    Category: category_cache,
+    Genre: genre_cache,
+}
+
+
+def get_catalog_cache(model):
+    return CATALOG_CACHES.get(model)
+
+
+def invalidate_catalog_cache(model):
+    get_catalog_cache(model).invalidate()
@@ -0,0 +1,45 @@
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from api.catalog_cache import category_cache
+from api.models import Title, Review
+
+TITLE_EXPORT_FIELDS = ('id', 'name', 'year', 'description', 'category_id', 'rating', 'updated_at')
+REVIEW_EXPORT_FIELDS = ('id', 'title_id', 'author__username', 'text', 'score', 'pub_date', 'updated_at')
+
+
+def _changed_since(queryset, since):
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return queryset.order_by('updated_at', 'id')
+
+
+def _to_line(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def iter_titles(since=None, chunk_size=2000):
+    rows = _changed_since(Title.objects.values(*TITLE_EXPORT_FIELDS), since).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        genres = {}
+        for title_id, slug in Title.genre.through.objects.filter(
+                title_id__in=[row['id'] for row in chunk]).values_list('title_id', 'genre__slug'):
+            genres.setdefault(title_id, []).append(slug)
+        categories = category_cache.get_many_by_ids({row['category_id'] for row in chunk})
+        for row in chunk:
+            category = categories.get(row.pop('category_id'))
+            row['category'] = category.slug if category else None
+            row['genre'] = genres.get(row['id'], [])
+            yield _to_line(row)
+
+
+def iter_reviews(since=None, chunk_size=2000):
+    rows = _changed_since(Review.objects.values(*REVIEW_EXPORT_FIELDS), since).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row['author'] = row.pop('author__username')
+        yield _to_line(row)
@@ -0,0 +1,42 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY_TEMPLATE = 'generation:{}'
+
+
+def _new_generation():
+    # Time based start value, so an evicted or cleared counter never returns to a value already in use
+    return int(time.time() * 1000)
+
+
+def get_generations(resources):
+    keys = [GENERATION_KEY_TEMPLATE.format(resource) for resource in resources]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _new_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def get_generation(resource):
+    return get_generations([resource])[0]
+
+
+def increment_generation(resource):
+    """Bumps counter now and returns the new value"""
+    key = GENERATION_KEY_TEMPLATE.format(resource)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = _new_generation()
+        cache.set(key, generation, timeout=None)
+        return generation
+
+
+def bump_generation(resource):
+    """Bumps counter now and once more on commit, so data read before the commit is not kept as current"""
+    increment_generation(resource)
+    transaction.on_commit(lambda: increment_generation(resource))
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Title, Review, User, Genre
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def percentile(cut_points, value):
+    return round(cut_points[value - 1] * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = ('Times API routes in-process with the test client on the current database, reports p50/p95/p99 and '
+            'queries per call and compares them with a baseline, fill the database with seed_benchmark_data first')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative p50 slowdown before a route counts as a regression')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('At least 2 iterations are needed for percentiles')
+        # Per request log lines of PerformanceMiddleware would drown the report
+        performance_logger = logging.getLogger('api_yamdb.performance')
+        performance_logger.disabled = True
+        try:
+            results = {name: self.run_route(client, path, options)
+                       for name, client, path in self.get_routes()}
+        finally:
+            performance_logger.disabled = False
+        for name, result in results.items():
+            self.stdout.write(f'{name}: p50 {result["p50_ms"]}ms, p95 {result["p95_ms"]}ms, '
+                              f'p99 {result["p99_ms"]}ms, {result["queries"]} queries')
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            with open(options['baseline'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+                file.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {options["baseline"]}'))
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(f'No baseline at {options["baseline"]}, run with --save-baseline to create it')
+            return
+        with open(options['baseline']) as file:
+            baseline = json.load(file)
+        regressions = self.compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def get_routes(self):
+        hot_title = Title.objects.order_by('-review_count', 'id').first()
+        hot_review = Review.objects.annotate(comment_count=Count('comments')).order_by('-comment_count', 'id').first()
+        popular_genre = Genre.objects.annotate(title_count=Count('titles')).order_by('-title_count', 'id').first()
+        user = User.objects.order_by('id').first()
+        if hot_title is None or hot_review is None or popular_genre is None or user is None:
+            raise CommandError('The database is empty, run seed_benchmark_data first')
+        anonymous = Client()
+        authenticated = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        reviews = f'/api/v1/titles/{hot_review.title_id}/reviews/'
+        return (
+            ('titles-list anonymous', anonymous, '/api/v1/titles/'),
+            ('titles-list', authenticated, '/api/v1/titles/'),
+            ('titles-list by genre', authenticated, f'/api/v1/titles/?genre={popular_genre.slug}'),
+            ('titles-detail', authenticated, f'/api/v1/titles/{hot_title.id}/'),
+            ('reviews-list', authenticated, f'/api/v1/titles/{hot_title.id}/reviews/'),
+            ('reviews-list cursor', authenticated, f'/api/v1/titles/{hot_title.id}/reviews/?pagination=cursor'),
+            ('comments-list', authenticated, f'{reviews}{hot_review.id}/comments/'),
+            ('categories-list', authenticated, '/api/v1/categories/'),
+            ('genres-list', authenticated, '/api/v1/genres/'),
+            ('search', authenticated, f'/api/v1/search/?q=synthetic+{hot_title.id}'),
+        )
+
+    @staticmethod
+    def run_route(client, path, options):
+        for _ in range(options['warmup']):
+            client.get(path)
+        timings = []
+        queries = 0
+        for _ in range(options['iterations']):
+            # One context per call, the captured query log is capped
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(path)
+                timings.append(time.perf_counter() - started)
+            queries += len(context.captured_queries)
+            if response.status_code != 200:
+                raise CommandError(f'{path} returned {response.status_code}')
+        cut_points = statistics.quantiles(timings, n=100)
+        return {
+            'path': path,
+            'p50_ms': percentile(cut_points, 50),
+            'p95_ms': percentile(cut_points, 95),
+            'p99_ms': percentile(cut_points, 99),
+            'queries': round(queries / options['iterations'], 2),
+        }
+
+    @staticmethod
+    def compare(results, baseline, tolerance):
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                regressions.append(f'{name}: {result["queries"]} queries per call, baseline {expected["queries"]}')
+            if result['p50_ms'] > expected['p50_ms'] * (1 + tolerance):
+                regressions.append(f'{name}: p50 {result["p50_ms"]}ms, baseline {expected["p50_ms"]}ms')
+        return regressions
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_yamdb.sqlite import get_sqlite_pragma_statements
+
+SCHEMA = (
+    'CREATE TABLE review (id INTEGER PRIMARY KEY AUTOINCREMENT, title_id INTEGER NOT NULL, '
+    'text VARCHAR(300) NOT NULL, score INTEGER NOT NULL)',
+    'CREATE INDEX review_title_idx ON review (title_id)',
+    'CREATE TABLE title (id INTEGER PRIMARY KEY, score_sum INTEGER NOT NULL, review_count INTEGER NOT NULL)',
+)
+TITLES = 100
+
+
+class Command(BaseCommand):
+    help = ('Measures concurrent review writes and title reads on a scratch SQLite file, '
+            'with default connection settings and with SQLITE_PRAGMAS')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('default', {'timeout': 5}, []),
+            ('tuned', settings.DATABASES['default'].get('OPTIONS', {}),
+             get_sqlite_pragma_statements(settings.SQLITE_PRAGMAS)),
+        )
+        for name, connect_options, pragmas in profiles:
+            reads, writes, errors = self.run_profile(connect_options, pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(f'{name}: {reads / seconds:.0f} reads/s, {writes / seconds:.0f} writes/s, '
+                              f'{errors} lock errors')
+
+    def run_profile(self, connect_options, pragmas, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.sqlite3')
+            setup = sqlite3.connect(path)
+            for statement in SCHEMA:
+                setup.execute(statement)
+            setup.executemany('INSERT INTO title VALUES (?, 0, 0)', [(i,) for i in range(TITLES)])
+            setup.commit()
+            setup.close()
+
+            counters = {'reads': 0, 'writes': 0, 'errors': 0}
+            lock = threading.Lock()
+            deadline = time.perf_counter() + options['seconds']
+
+            def connect():
+                connection = sqlite3.connect(path, check_same_thread=False, **connect_options)
+                for statement in pragmas:
+                    connection.execute(statement)
+                return connection
+
+            def count(name):
+                with lock:
+                    counters[name] += 1
+
+            def write(worker):
+                connection = connect()
+                i = 0
+                while time.perf_counter() < deadline:
+                    title_id = (worker * 7919 + i) % TITLES
+                    i += 1
+                    try:
+                        with connection:
+                            connection.execute('INSERT INTO review (title_id, text, score) VALUES (?, ?, ?)',
+                                               (title_id, 'benchmark', 5))
+                            connection.execute('UPDATE title SET score_sum = score_sum + 5, '
+                                               'review_count = review_count + 1 WHERE id = ?', (title_id,))
+                        count('writes')
+                    except sqlite3.OperationalError:
+                        count('errors')
+                connection.close()
+
+            def read(worker):
+                connection = connect()
+                i = 0
+                while time.perf_counter() < deadline:
+                    title_id = (worker * 104729 + i) % TITLES
+                    i += 1
+                    try:
+                        connection.execute('SELECT id, text, score FROM review WHERE title_id = ? '
+                                           'ORDER BY id DESC LIMIT 10', (title_id,)).fetchall()
+                        connection.execute('SELECT score_sum, review_count FROM title WHERE id = ?',
+                                           (title_id,)).fetchone()
+                        count('reads')
+                    except sqlite3.OperationalError:
+                        count('errors')
+                connection.close()
+
+            threads = [threading.Thread(target=write, args=(i,)) for i in range(options['writers'])]
+            threads += [threading.Thread(target=read, args=(i,)) for i in range(options['readers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return counters['reads'], counters['writes'], counters['errors']
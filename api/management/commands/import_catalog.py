@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from api.autocomplete import title_name_index
+from api.catalog_cache import invalidate_catalog_cache
+from api.generations import bump_generation
+from api.models import Category, Genre, Title, User, Review, Comment
+from api.response_cache import TITLES, CATEGORIES, GENRES
+
+PROGRESS_FILE_NAME = '.import_catalog_progress.json'
+
+
+def build_category(row):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_genre(row):
+    return Genre(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_user(row):
+    role = row.get('role') or 'user'
+    return User(id=row['id'], username=row['username'], email=row.get('email', ''),
+                role=User.convert_verbose_role_to_db_value(role), bio=row.get('bio', ''),
+                first_name=row.get('first_name', ''), last_name=row.get('last_name', ''),
+                password=make_password(None))
+
+
+def build_title(row):
+    return Title(id=row['id'], name=row['name'], year=row['year'], category_id=row['category'],
+                 description=row.get('description', ''))
+
+
+def build_title_genre(row):
+    return Title.genre.through(title_id=row['title_id'], genre_id=row['genre_id'])
+
+
+def build_review(row):
+    review = Review(id=row['id'], title_id=row['title_id'], author_id=row['author'], text=row['text'],
+                    score=row['score'])
+    if row.get('pub_date'):
+        review.pub_date = row['pub_date']
+    return review
+
+
+def build_comment(row):
+    comment = Comment(id=row['id'], review_id=row['review_id'], author_id=row['author'], text=row['text'])
+    comment.pub_date = row.get('pub_date') or timezone.now()
+    return comment
+
+
+def invalidate_caches():
+    # bulk_create sends no signals
+    invalidate_catalog_cache(Category)
+    invalidate_catalog_cache(Genre)
+    for resource in (TITLES, CATEGORIES, GENRES):
+        bump_generation(resource)
+    title_name_index.invalidate()
+
+
+# Order matters, every entity only references entities imported before it
+ENTITIES = (
+    ('category', Category, build_category),
+    ('genre', Genre, build_genre),
+    ('users', User, build_user),
+    ('titles', Title, build_title),
+    ('genre_title', Title.genre.through, build_title_genre),
+    ('review', Review, build_review),
+    ('comments', Comment, build_comment),
+)
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+@contextmanager
+def keep_source_pub_date():
+    # Comment.pub_date is auto_now_add, imported comments keep their own date when the source has one
+    field = Comment._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = ('Imports category, genre, users, titles, genre_title, review and comments .csv or .jsonl files '
+            'from a directory with batched bulk inserts, resuming after the last imported batch')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--restart', action='store_true', help='Ignore progress of a previous run')
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isdir(directory):
+            raise CommandError(f'{directory} is not a directory')
+        progress_path = os.path.join(directory, PROGRESS_FILE_NAME)
+        progress = {} if options['restart'] else self.load_progress(progress_path)
+
+        with keep_source_pub_date():
+            for name, model, build in ENTITIES:
+                path = self.find_source(directory, name)
+                if path is None:
+                    continue
+                self.import_entity(name, model, build, path, options['batch_size'], progress, progress_path)
+
+        started = time.perf_counter()
+        Title.rebuild_ratings()
+        self.stdout.write(f'Rebuilt title ratings in {time.perf_counter() - started:.2f}s')
+        invalidate_caches()
+        if os.path.exists(progress_path):
+            os.remove(progress_path)
+        self.stdout.write(self.style.SUCCESS('Import finished'))
+
+    @staticmethod
+    def find_source(directory, name):
+        for extension in ('.csv', '.jsonl'):
+            path = os.path.join(directory, name + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def load_progress(progress_path):
+        if not os.path.exists(progress_path):
+            return {}
+        with open(progress_path) as file:
+            return json.load(file)
+
+    @staticmethod
+    def save_progress(progress, progress_path):
+        with open(progress_path, 'w') as file:
+            json.dump(progress, file)
+
+    def import_entity(self, name, model, build, path, batch_size, progress, progress_path):
+        done = progress.get(name, 0)
+        rows = islice(read_rows(path), done, None)
+        imported = already_present = 0
+        started = time.perf_counter()
+        while True:
+            batch = [build(row) for row in islice(rows, batch_size)]
+            if not batch:
+                break
+            try:
+                with transaction.atomic():
+                    if done and not imported:
+                        # Progress is saved after the commit, the batch in flight on failure may be in the database
+                        count_before = model.objects.count()
+                        model.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+                        already_present = len(batch) - (model.objects.count() - count_before)
+                    else:
+                        model.objects.bulk_create(batch, batch_size=batch_size)
+            except IntegrityError as error:
+                first_row = done + imported + 1
+                raise CommandError(f'{name}: rows {first_row}-{first_row + len(batch) - 1} were not imported, {error}')
+            imported += len(batch)
+            progress[name] = done + imported
+            self.save_progress(progress, progress_path)
+        inserted = imported - already_present
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed else 0
+        skipped = f', {done + already_present} already imported' if done else ''
+        self.stdout.write(f'{name}: {inserted} rows in {elapsed:.2f}s ({rate:.0f} rows/s){skipped}')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from api.business_logic import purge_expired_email_codes
+
+
+class Command(BaseCommand):
+    help = 'Deletes registration codes older than EMAIL_CODE_LIFETIME'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'Deleted {purge_expired_email_codes()} expired codes'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Recalculates score_sum, review_count and rating of every title from its reviews'
+
+    def handle(self, *args, **options):
+        Title.rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings of {Title.objects.count()} titles'))
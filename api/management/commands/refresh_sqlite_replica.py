@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copies the default SQLite database into every DATABASE_REPLICAS alias with the online backup API'
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Replica refresh supports only SQLite databases')
+        # Django connections, so NAME is opened the way Django opens it, in-memory test databases included
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            source.connection.backup(replica.connection)
+            self.stdout.write(f'Refreshed {alias}')
@@ -0,0 +1,116 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.management.commands.import_catalog import invalidate_caches
+from api.models import Category, Genre, Title, User, Review, Comment
+
+CATEGORIES = 5
+GENRES = 20
+# Row counts at --scale 1, about 12k rows in total
+USERS = 200
+TITLES = 500
+REVIEWS = 5000
+COMMENTS = 5000
+MAX_GENRES_PER_TITLE = 3
+
+
+def zipf_counts(total, size, exponent, rng, cap=None):
+    """Splits total between size items proportionally to 1 / rank ** exponent, ranks shuffled"""
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    rng.shuffle(weights)
+    factor = total / sum(weights)
+    return [min(round(weight * factor), cap) if cap else round(weight * factor) for weight in weights]
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = ('Fills the database with synthetic titles, reviews and comments, reviews per title, comments per review '
+            'and genres per title follow a Zipf distribution')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1,
+                            help='Multiplier of the default row counts, 1 gives about 12k rows, 1000 about 12M')
+        parser.add_argument('--exponent', type=float, default=1.1, help='Zipf exponent')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        scale, exponent, batch_size = options['scale'], options['exponent'], options['batch_size']
+        users, titles = max(1, int(USERS * scale)), max(1, int(TITLES * scale))
+        now = timezone.now()
+
+        first_category = next_id(Category)
+        category_ids = range(first_category, first_category + CATEGORIES)
+        self.insert(Category, batch_size, (
+            Category(id=i, name=f'Benchmark category {i}', slug=f'benchmark-category-{i}') for i in category_ids))
+        first_genre = next_id(Genre)
+        genre_ids = range(first_genre, first_genre + GENRES)
+        self.insert(Genre, batch_size, (
+            Genre(id=i, name=f'Benchmark genre {i}', slug=f'benchmark-genre-{i}') for i in genre_ids))
+
+        password = make_password(None)
+        first_user = next_id(User)
+        user_ids = range(first_user, first_user + users)
+        self.insert(User, batch_size, (
+            User(id=i, username=f'benchmark{i}', email=f'benchmark{i}@yamdb.fake', password=password)
+            for i in user_ids))
+
+        first_title = next_id(Title)
+        title_ids = range(first_title, first_title + titles)
+        self.insert(Title, batch_size, (
+            Title(id=i, name=f'Benchmark title {i}', year=rng.randint(1900, now.year),
+                  description=f'Synthetic title number {i}', category_id=rng.choice(category_ids))
+            for i in title_ids))
+        genre_weights = [1 / rank ** exponent for rank in range(1, GENRES + 1)]
+        self.insert(Title.genre.through, batch_size, (
+            Title.genre.through(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in set(rng.choices(genre_ids, genre_weights, k=rng.randint(1, MAX_GENRES_PER_TITLE)))))
+
+        reviews_per_title = zipf_counts(int(REVIEWS * scale), titles, exponent, rng, cap=users)
+        first_review = next_id(Review)
+        review_ids = range(first_review, first_review + sum(reviews_per_title))
+        review_keys = ((title_id, author_id) for title_id, count in zip(title_ids, reviews_per_title)
+                       for author_id in rng.sample(user_ids, count))
+        self.insert(Review, batch_size, (
+            Review(id=review_id, title_id=title_id, author_id=author_id, text=f'Synthetic review of title {title_id}',
+                   score=rng.randint(1, 10), pub_date=now - timedelta(minutes=rng.randint(0, 525600)))
+            for review_id, (title_id, author_id) in zip(review_ids, review_keys)))
+
+        comments_per_review = zipf_counts(int(COMMENTS * scale), len(review_ids), exponent, rng)
+        self.insert(Comment, batch_size, (
+            Comment(review_id=review_id, author_id=rng.choice(user_ids), text=f'Synthetic comment on {review_id}')
+            for review_id, count in zip(review_ids, comments_per_review)
+            for _ in range(count)))
+
+        started = time.perf_counter()
+        Title.rebuild_ratings()
+        self.stdout.write(f'Rebuilt title ratings in {time.perf_counter() - started:.2f}s')
+        invalidate_caches()
+        self.stdout.write(self.style.SUCCESS('Benchmark data created'))
+
+    def insert(self, model, batch_size, objects):
+        inserted = 0
+        started = time.perf_counter()
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            inserted += len(batch)
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed else 0
+        self.stdout.write(f'{model._meta.db_table}: {inserted} rows in {elapsed:.2f}s ({rate:.0f} rows/s)')
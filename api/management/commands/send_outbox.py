@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import send_due_emails
+
+
+class Command(BaseCommand):
+    help = ('Sends queued emails from the outbox, reusing one mail connection per batch, '
+            'several workers may run as every batch is claimed before sending')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain due emails and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_due_emails(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+            if sent + failed < options['batch_size']:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 3.0.5 on 2026-10-18 18:13
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.utils.timezone
+
+
+def remove_duplicate_email_codes(apps, schema_editor):
+    EmailCode = apps.get_model('api', 'EmailCode')
+    latest_ids = EmailCode.objects.values('email').annotate(latest_id=Max('id')).values('latest_id')
+    EmailCode.objects.exclude(id__in=latest_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailcode',
+            name='sent_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(remove_duplicate_email_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='emailcode',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+    ]
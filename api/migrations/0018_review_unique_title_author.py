@@ -0,0 +1,41 @@
+# Generated by Django 3.0.5 on 2026-10-18 18:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    first_ids = Review.objects.values('title_id', 'author_id').annotate(first_id=Min('id')).values('first_id')
+    duplicates = Review.objects.exclude(id__in=first_ids)
+    title_ids = set(duplicates.values_list('title_id', flat=True))
+    if not title_ids:
+        return
+    duplicates.delete()
+    aggregates = Review.objects.filter(title_id__in=title_ids).values('title_id').annotate(
+        score_sum=Sum('score'), review_count=Count('pk'))
+    for row in aggregates:
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['score_sum'],
+            review_count=row['review_count'],
+            rating=round(row['score_sum'] / row['review_count'], 2))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_email_code_unique_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='review_author_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('title', 'author'), name='review_unique_title_author'),
+        ),
+    ]
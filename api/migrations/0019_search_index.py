@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# External content FTS5 tables, triggers keep them in sync with every insert, update and delete
+CREATE_SEARCH_INDEX = (
+    "CREATE VIRTUAL TABLE api_title_fts USING fts5("
+    "name, description, content='api_title', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER api_title_fts_insert AFTER INSERT ON api_title BEGIN "
+    "INSERT INTO api_title_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER api_title_fts_delete AFTER DELETE ON api_title BEGIN "
+    "INSERT INTO api_title_fts(api_title_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER api_title_fts_update AFTER UPDATE OF name, description ON api_title BEGIN "
+    "INSERT INTO api_title_fts(api_title_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO api_title_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "INSERT INTO api_title_fts(api_title_fts) VALUES ('rebuild')",
+
+    "CREATE VIRTUAL TABLE api_review_fts USING fts5("
+    "text, content='api_review', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER api_review_fts_insert AFTER INSERT ON api_review BEGIN "
+    "INSERT INTO api_review_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER api_review_fts_delete AFTER DELETE ON api_review BEGIN "
+    "INSERT INTO api_review_fts(api_review_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER api_review_fts_update AFTER UPDATE OF text ON api_review BEGIN "
+    "INSERT INTO api_review_fts(api_review_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO api_review_fts(rowid, text) VALUES (new.id, new.text); END",
+    "INSERT INTO api_review_fts(api_review_fts) VALUES ('rebuild')",
+)
+
+DROP_SEARCH_INDEX = (
+    'DROP TRIGGER api_title_fts_insert',
+    'DROP TRIGGER api_title_fts_delete',
+    'DROP TRIGGER api_title_fts_update',
+    'DROP TABLE api_title_fts',
+    'DROP TRIGGER api_review_fts_insert',
+    'DROP TRIGGER api_review_fts_delete',
+    'DROP TRIGGER api_review_fts_update',
+    'DROP TABLE api_review_fts',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_review_unique_title_author'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH_INDEX, DROP_SEARCH_INDEX),
+    ]
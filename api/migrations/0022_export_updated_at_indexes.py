@@ -0,0 +1,36 @@
+# Generated by Django 3.0.5 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_title_category_rating_index'),
+    ]
+
+    operations = [
+        # AlterField would rebuild api_title on SQLite and drop the search index triggers with the old table
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX "api_title_updated_at_4e4282bd"',
+                    'CREATE INDEX "api_title_updated_at_4e4282bd" ON "api_title" ("updated_at")'),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='updated_at',
+                    field=models.DateTimeField(auto_now=True),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['updated_at', 'id'], name='review_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['updated_at', 'id'], name='title_updated_at_idx'),
+        ),
+    ]
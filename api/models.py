@@ -1,10 +1,16 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import Case, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+from django.dispatch import Signal
 from django.utils import timezone
 
 from api.errors import BadVerboseRole
 
+title_rating_changed = Signal()
+
 
 class User(AbstractUser):
     USER = 1
@@ -49,16 +55,59 @@ class Title(models.Model):
     category = models.ForeignKey('Category', on_delete=models.DO_NOTHING, related_name='titles')
     description = models.CharField(max_length=255, blank=True)
     rating = models.FloatField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    score_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
     genre = models.ManyToManyField(
         'Genre',
         related_name='titles',
         blank=True,
         default=None)
 
-    def update_rating(self):
-        reviews = self.reviews.all()
-        self.rating = round(sum([review.score for review in reviews]) / len(reviews), 2)
-        self.save()
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['rating'], name='title_rating_idx'),
+            models.Index(fields=['category', 'rating'], name='title_category_rating_idx'),
+            models.Index(fields=['updated_at', 'id'], name='title_updated_at_idx'),
+        ]
+
+    @staticmethod
+    def rating_expression(score_delta=0, count_delta=0):
+        """Rating computed from aggregates after applying deltas, rounded to 2 digits, None without reviews"""
+        average = ExpressionWrapper(
+            Cast(F('score_sum') + score_delta, FloatField()) * 100 / (F('review_count') + count_delta),
+            output_field=FloatField())
+        return Case(
+            When(review_count=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(Round(average) / 100, output_field=FloatField()),
+            output_field=FloatField())
+
+    @classmethod
+    def shift_rating(cls, title_id, score_delta, count_delta, **conditions):
+        """Applies review score change to title aggregates in a single UPDATE without reading reviews
+
+        score_delta may be an expression over the stored review row, conditions further narrow the UPDATE, nothing
+        is signalled when they leave no title to update.
+        """
+        updated = cls.objects.filter(pk=title_id, **conditions).update(
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta,
+            rating=cls.rating_expression(score_delta, count_delta),
+            updated_at=timezone.now())
+        if updated:
+            title_rating_changed.send(sender=cls, title_ids=[title_id], review_counts_changed=count_delta != 0)
+
+    @classmethod
+    def rebuild_ratings(cls):
+        """Recalculates aggregates of all titles from reviews, use to fix drift after bulk operations"""
+        reviews = Review.objects.filter(title=OuterRef('pk')).order_by().values('title')
+        cls.objects.update(
+            score_sum=Coalesce(Subquery(reviews.annotate(total=models.Sum('score')).values('total')), 0),
+            review_count=Coalesce(Subquery(reviews.annotate(total=models.Count('pk')).values('total')), 0))
+        cls.objects.update(rating=cls.rating_expression(), updated_at=timezone.now())
+        title_rating_changed.send(sender=cls, title_ids=None, review_counts_changed=True)
 
 
 class Category(models.Model):
@@ -83,15 +132,53 @@ class Review(models.Model):
     text = models.CharField(max_length=300)
     score = models.IntegerField(choices=enumerate(range(11)), validators=[MaxValueValidator(10), MinValueValidator(1)])
     pub_date = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'author'], name='review_unique_title_author'),
+        ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'], name='review_title_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date', 'id'], name='review_author_pub_date_idx'),
+            models.Index(fields=['updated_at', 'id'], name='review_updated_at_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
-        super().save(force_insert, force_update, using, update_fields)
-        self.title.update_rating()
+        if update_fields is not None and not {'title', 'score'} & set(update_fields):
+            super().save(force_insert, force_update, using, update_fields)
+            return
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            if not adding:
+                self._replace_in_rating()
+            super().save(force_insert, force_update, using, update_fields)
+            if adding:
+                Title.shift_rating(self.title_id, self.score, 1)
+        self._loaded_title_id = self.title_id
+
+    def _replace_in_rating(self):
+        # Deltas come from the stored row inside the UPDATE, a copy loaded earlier may hold outdated values
+        stored = Review.objects.filter(pk=self.pk)
+        stored_score = Subquery(stored.values('score'))
+        loaded_title_id = getattr(self, '_loaded_title_id', None) or self.title_id
+        if loaded_title_id == self.title_id:
+            Title.shift_rating(self.title_id, self.score - stored_score, 0,
+                               pk__in=stored.exclude(score=self.score).values('title_id'))
+        else:
+            Title.shift_rating(loaded_title_id, -stored_score, -1, pk__in=stored.values('title_id'))
+            Title.shift_rating(self.title_id, self.score, 1)
 
-    def delete(self, using=None, keep_parents=False):
-        result = super().delete(using, keep_parents)
-        self.title.update_rating()
-        return result
+    def remove_from_rating(self):
+        """Subtracts the stored row from title aggregates, called from pre_delete while the row still exists"""
+        stored = Review.objects.filter(pk=self.pk)
+        Title.shift_rating(self.title_id, -Subquery(stored.values('score')), -1, pk__in=stored.values('title_id'))
 
     def date_iso_format(self):
         return self.pub_date.isoformat()
@@ -102,8 +189,56 @@ class Comment(models.Model):
     text = models.CharField(max_length=255)
     review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'], name='comment_review_pub_date_idx'),
+        ]
+
+
+class EmailCodeQuerySet(models.QuerySet):
+
+    def upsert(self, email, code):
+        """Inserts or replaces code of the email with one INSERT ... ON CONFLICT statement"""
+        # self.db is routed as a read, this is a write
+        connection = connections[self._db or router.db_for_write(self.model)]
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote_name(self.model._meta.db_table)} ({quote_name("email")}, {quote_name("code")}, '
+                f'{quote_name("sent_at")}) VALUES (%s, %s, %s) ON CONFLICT ({quote_name("email")}) '
+                f'DO UPDATE SET {quote_name("code")} = excluded.{quote_name("code")}, '
+                f'{quote_name("sent_at")} = excluded.{quote_name("sent_at")}',
+                [email, code, connection.ops.adapt_datetimefield_value(timezone.now())])
+
+    def active(self):
+        return self.filter(sent_at__gte=timezone.now() - settings.EMAIL_CODE_LIFETIME)
+
+    def expired(self):
+        return self.filter(sent_at__lt=timezone.now() - settings.EMAIL_CODE_LIFETIME)
 
 
 class EmailCode(models.Model):
-    email = models.EmailField()
+    email = models.EmailField(unique=True)
     code = models.CharField(max_length=36)
+    sent_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = EmailCodeQuerySet.as_manager()
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    recipient = models.EmailField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'next_attempt_at'], name='outgoing_email_pending_idx'),
+        ]
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(seconds=30)
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def enqueue_email(subject: str, content: str, from_email: str, recipient: str):
+    return OutgoingEmail.objects.create(subject=subject, body=content, from_email=from_email, recipient=recipient)
+
+
+def get_due_emails(batch_size):
+    return list(OutgoingEmail.objects.filter(
+        sent_at__isnull=True, attempts__lt=MAX_ATTEMPTS, next_attempt_at__lte=timezone.now()
+    ).order_by('next_attempt_at', 'id')[:batch_size])
+
+
+def claim_due_emails(batch_size):
+    """Due emails this worker now owns, their next attempt is moved past CLAIM_TIMEOUT so other workers skip them
+
+    Each claim is an UPDATE conditional on the next_attempt_at that was read, an email another worker claimed in
+    between is left out. A worker that dies while sending releases its emails when the claim times out.
+    """
+    claimed = []
+    claimed_until = timezone.now() + CLAIM_TIMEOUT
+    with transaction.atomic():
+        for email in get_due_emails(batch_size):
+            if OutgoingEmail.objects.filter(pk=email.pk, next_attempt_at=email.next_attempt_at).update(
+                    next_attempt_at=claimed_until):
+                email.next_attempt_at = claimed_until
+                claimed.append(email)
+    return claimed
+
+
+def reschedule_email(email, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt_at = timezone.now() + RETRY_BASE_DELAY * 2 ** (email.attempts - 1)
+    email.save(update_fields=['attempts', 'last_error', 'next_attempt_at'])
+
+
+def send_due_emails(batch_size=100, connection=None):
+    """Sends one batch of due emails over a single connection, failed ones are rescheduled with backoff"""
+    emails = claim_due_emails(batch_size)
+    if not emails:
+        return 0, 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:  # noqa: unreachable mail server postpones the whole batch
+        for email in emails:
+            reschedule_email(email, error)
+        return 0, len(emails)
+    sent = failed = 0
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, email.from_email, [email.recipient],
+                                   connection=connection)
+            try:
+                message.send()
+            except Exception as error:  # noqa: any backend error only postpones this email
+                reschedule_email(email, error)
+                failed += 1
+            else:
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.save(update_fields=['attempts', 'sent_at'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
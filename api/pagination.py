@@ -0,0 +1,32 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ('pub_date', 'id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """Limit/offset by default, keyset pagination by (pub_date, id) when client asks ?pagination=cursor"""
+    cursor_pagination_class = PubDateCursorPagination
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        return request.query_params.get(self.mode_query_param) == self.cursor_mode \
+            or cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
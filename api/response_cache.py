@@ -0,0 +1,61 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.generations import get_generations
+from api_yamdb.routers import primary_reads
+
+TITLES = 'titles'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+USERS = 'users'
+RESPONSE_KEY_TEMPLATE = 'response_cache:{}'
+CACHED_HEADERS = ('ETag',)
+
+
+def title_reviews_resource(title_id):
+    return f'title_reviews:{title_id}'
+
+
+def review_comments_resource(review_id):
+    return f'review_comments:{review_id}'
+
+
+def build_response_key(resources, url):
+    generations = ':'.join(map(str, get_generations(resources)))
+    digest = hashlib.md5(f'{generations}:{url}'.encode()).hexdigest()
+    return RESPONSE_KEY_TEMPLATE.format(digest)
+
+
+class AnonymousResponseCacheMixin:
+    """Caches list and retrieve data for anonymous users, keyed by the full url and generations of used resources
+
+    The ETag is cached with the data, so conditional requests are answered without the database.
+    """
+    cache_resources = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = build_response_key(self.cache_resources, request.build_absolute_uri())
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            response = Response(data, headers=headers)
+            return get_conditional_response(request, etag=response.get('ETag'), response=response)
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+            cache.set(key, (response.data, headers), settings.RESPONSE_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,44 @@
+import re
+
+from django.db import connection
+
+from api.models import Title, Review
+
+TITLE_INDEX = 'api_title_fts'
+REVIEW_INDEX = 'api_review_fts'
+# bm25 column weights, a match in the name outranks one in the description
+TITLE_COLUMN_WEIGHTS = (10.0, 1.0)
+TOKEN_RE = re.compile(r'\w+')
+
+
+def build_match_query(text):
+    """Turns user input into an FTS5 query of quoted tokens, the last one matched as a prefix, None without tokens"""
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _ranked_ids(index, match_query, limit, weights=()):
+    rank = f'bm25({index}, {", ".join(map(str, weights))})' if weights else 'rank'
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT rowid FROM {index} WHERE {index} MATCH %s ORDER BY {rank} LIMIT %s',
+                       [match_query, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _in_order(queryset, ids):
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def search_titles(match_query, limit):
+    ids = _ranked_ids(TITLE_INDEX, match_query, limit, TITLE_COLUMN_WEIGHTS)
+    return _in_order(Title.objects.prefetch_related('genre'), ids)
+
+
+def search_reviews(match_query, limit):
+    ids = _ranked_ids(REVIEW_INDEX, match_query, limit)
+    return _in_order(Review.objects.select_related('author'), ids)
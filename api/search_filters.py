@@ -1,16 +1,56 @@
+from django.db.models import Count
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
+from api.catalog_cache import genre_cache, category_cache
 from api.models import Title
 
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+
 
 class TitleFilter(filters.FilterSet):
+    """?genre= takes comma separated slugs, matched with any of them or, with ?genre_mode=all, all of them"""
     genre = filters.CharFilter(field_name='genre', method='slugs__exact')
-    category = filters.CharFilter(field_name='category', lookup_expr='slug__exact')
+    genre_mode = filters.ChoiceFilter(choices=((GENRE_MODE_ANY, GENRE_MODE_ANY), (GENRE_MODE_ALL, GENRE_MODE_ALL)),
+                                      method='used_by_genre_filter')
+    category = filters.CharFilter(field_name='category', method='category_slug__exact')
     name = filters.CharFilter(field_name='name', lookup_expr='iexact')
 
     def slugs__exact(self, queryset, name, value):
-        return queryset.filter(genre__slug__exact=value)
+        slugs = {slug.strip() for slug in value.split(',') if slug.strip()}
+        genres = genre_cache.get_many_by_slugs(slugs)
+        match_all = self.form.cleaned_data.get('genre_mode') == GENRE_MODE_ALL
+        if not genres or match_all and len(genres) < len(slugs):
+            return queryset.none()
+        # One subquery over the link table instead of a join per genre, titles are never duplicated
+        links = Title.genre.through.objects.filter(genre_id__in=[genre.pk for genre in genres.values()])
+        if match_all:
+            links = links.values('title_id').annotate(genre_count=Count('genre_id')).filter(genre_count=len(genres))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def used_by_genre_filter(self, queryset, name, value):
+        return queryset
+
+    def category_slug__exact(self, queryset, name, value):
+        category = category_cache.get_by_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category=category.pk)
 
     class Meta:
         model = Title
-        fields = ['name', 'genre', 'category', 'year']
+        fields = {
+            'year': ['exact', 'gte', 'lte'],
+            'rating': ['gte', 'lte'],
+        }
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Appends id in the direction of the last sort key, pages stay stable and an index on the key can be walked"""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view) or ())
+        if not any(term.lstrip('-') in ('id', 'pk') for term in ordering):
+            ordering.append('-id' if ordering and ordering[-1].startswith('-') else 'id')
+        return ordering
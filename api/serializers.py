@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from rest_framework.fields import empty  # noqa
+from rest_framework.relations import MANY_RELATION_KWARGS
 from rest_framework.validators import UniqueValidator
 
+from api.catalog_cache import get_catalog_cache
 from api.models import Review, Comment, User, Category, Genre, Title
+from api_yamdb.instrumentation import timed
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TimedModelSerializer(serializers.ModelSerializer):
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+
+class ReviewSerializer(TimedModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     pub_date = serializers.ReadOnlyField(source='date_iso_format')
 
@@ -14,16 +24,34 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'author', 'text', 'score', 'pub_date')
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class SearchReviewSerializer(ReviewSerializer):
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+        read_only_fields = fields
+
+
+class CommentSerializer(TimedModelSerializer):
+    EXPAND_QUERY_PARAM = 'expand'
     author = serializers.ReadOnlyField(source='author.username')
-    review = ReviewSerializer(read_only=True)
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    def __init__(self, instance=None, data=empty, **kwargs):
+        super().__init__(instance, data, **kwargs)
+        if self.review_expanded(self.context.get('request')):
+            self.fields['review'] = ReviewSerializer(read_only=True)
+
+    @classmethod
+    def review_expanded(cls, request):
+        if request is None:
+            return False
+        return 'review' in request.query_params.get(cls.EXPAND_QUERY_PARAM, '').split(',')
 
     class Meta:
         model = Comment
         fields = ('id', 'author', 'text', 'review', 'pub_date')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
     role = serializers.CharField(source='get_role_display', read_only=True)
 
     class Meta:
@@ -33,7 +61,7 @@ class UserSerializer(serializers.ModelSerializer):
                         'email': {'required': True, 'validators': [UniqueValidator(User.objects.all())]}}
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     class Meta:
         model = Category
         fields = ('name', 'slug')
@@ -41,22 +69,61 @@ class CategorySerializer(serializers.ModelSerializer):
                         'slug': {'required': True, 'validators': [UniqueValidator(Category.objects.all())]}}
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedModelSerializer):
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
+class NameSlugManyField(serializers.ManyRelatedField):
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve_slugs(data)
+
+
 class NameSlugField(serializers.RelatedField):
+    default_error_messages = {
+        'does_not_exist': 'Objects with slugs {slugs} do not exist.',
+    }
 
     def __init__(self, model, slug_only=True, **kwargs):
         self.model = model
         self.queryset = model.objects.all()
+        self.catalog_cache = get_catalog_cache(model)
         self.slug_only = slug_only
         super().__init__(**kwargs)
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return NameSlugManyField(**list_kwargs)
+
+    def get_attribute(self, instance):
+        if self.catalog_cache is None:
+            return super().get_attribute(instance)
+        related_id = getattr(instance, instance._meta.get_field(self.source).attname)
+        return self.catalog_cache.get_by_id(related_id)
+
+    def resolve_slugs(self, slugs):
+        slugs = list(dict.fromkeys(map(str, slugs)))
+        if self.catalog_cache is not None:
+            objects_by_slug = self.catalog_cache.get_many_by_slugs(slugs)
+        else:
+            objects_by_slug = {obj.slug: obj for obj in self.model.objects.filter(slug__in=slugs)}
+        missing_slugs = [slug for slug in slugs if slug not in objects_by_slug]
+        if missing_slugs:
+            self.fail('does_not_exist', slugs=', '.join(missing_slugs))
+        return [objects_by_slug[slug] for slug in slugs]
+
     def to_internal_value(self, slug):
-        return self.model.objects.get(slug=slug)
+        return self.resolve_slugs([slug])[0]
 
     def to_representation(self, field):
         if self.slug_only:
@@ -66,7 +133,7 @@ class NameSlugField(serializers.RelatedField):
             if hasattr(field, 'all') else {'name': field.name, 'slug': field.slug}
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedModelSerializer):
 
     def __init__(self, instance=None, data=empty, slug_only=False, **kwargs):
         super().__init__(instance, data, **kwargs)
@@ -76,3 +143,4 @@ class TitleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'description', 'genre', 'category', 'rating')
+        read_only_fields = ('rating',)
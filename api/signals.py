@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, pre_delete, post_migrate, m2m_changed
+from django.dispatch import receiver
+
+from api.authentication import invalidate_cached_user
+from api.autocomplete import title_name_index
+from api.catalog_cache import invalidate_catalog_cache, CATALOG_CACHES
+from api.generations import bump_generation
+from api.models import Category, Genre, Title, Review, Comment, User, title_rating_changed
+from api.response_cache import TITLES, CATEGORIES, GENRES, USERS, title_reviews_resource, review_comments_resource
+
+RESPONSE_CACHE_RESOURCES = {
+    Title: TITLES,
+    Category: CATEGORIES,
+    Genre: GENRES,
+}
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_catalog_cache_on_change(sender, **kwargs):
+    invalidate_catalog_cache(sender)
+
+
+@receiver(pre_delete, sender=Review)
+def shift_title_rating_on_review_delete(sender, instance, **kwargs):
+    # Sent for every row, cascades from users and titles and queryset deletes included
+    instance.remove_from_rating()
+
+
+@receiver([post_save, post_delete], sender=Title)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+def bump_response_cache_generation_on_change(sender, **kwargs):
+    bump_generation(RESPONSE_CACHE_RESOURCES[sender])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_titles_generation_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_generation(TITLES)
+
+
+@receiver(title_rating_changed)
+def bump_titles_generation_on_rating_change(sender, **kwargs):
+    bump_generation(TITLES)
+
+
+@receiver(post_save, sender=Title)
+def patch_title_name_index_on_save(sender, instance, **kwargs):
+    title_name_index.title_saved(instance)
+
+
+@receiver(post_delete, sender=Title)
+def patch_title_name_index_on_delete(sender, instance, **kwargs):
+    title_name_index.title_deleted(instance.pk)
+
+
+@receiver(title_rating_changed)
+def refresh_title_name_index_on_rating_change(sender, title_ids, review_counts_changed, **kwargs):
+    # Suggestions are ranked by review count, score edits do not move them
+    if review_counts_changed:
+        title_name_index.ratings_changed(title_ids)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user_on_change(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    bump_generation(USERS)
+
+
+@receiver(post_delete, sender=Title)
+def bump_title_reviews_generation_on_title_delete(sender, instance, **kwargs):
+    bump_generation(title_reviews_resource(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def bump_review_list_generations_on_change(sender, instance, **kwargs):
+    bump_generation(title_reviews_resource(instance.title_id))
+    # Comment pages may embed the review
+    bump_generation(review_comments_resource(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def bump_comment_list_generation_on_change(sender, instance, **kwargs):
+    bump_generation(review_comments_resource(instance.review_id))
+
+
+@receiver(post_migrate)
+def invalidate_caches_on_migrate(sender, **kwargs):
+    # Emitted by migrate and flush, afterwards nothing cached about database rows can be trusted
+    cache.clear()
+    for model in CATALOG_CACHES:
+        invalidate_catalog_cache(model)
+    title_name_index.reset()
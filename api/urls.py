@@ -3,7 +3,7 @@ from rest_framework_nested import routers
 
 from api.views import TitleView, ReviewView, \
     CommentView, get_user_email_and_send_code_to_it, verify_user_code, UserAdminView, UserProfileView, CategoryView, \
-    GenreView
+    GenreView, ExportView, SearchView
 
 main_router = routers.SimpleRouter()
 main_router.register(prefix='titles', viewset=TitleView, basename='titles')
@@ -18,11 +18,17 @@ comments_router = routers.NestedSimpleRouter(parent_router=reviews_router, paren
 comments_router.register(prefix='comments', viewset=CommentView, basename='comments')
 
 user_profile_view = UserProfileView.as_view({'get': 'get_own_profile_info', 'patch': 'change_own_profile_info'})
+export_titles_view = ExportView.as_view({'get': 'export_titles'})
+export_reviews_view = ExportView.as_view({'get': 'export_reviews'})
+search_view = SearchView.as_view({'get': 'list'})
 
 urlpatterns = [
     path('auth/email/', get_user_email_and_send_code_to_it,
          name='get_user_email_and_send_code_to_it'),
     path('auth/token/', verify_user_code, name='verify_user_code'),
     path('users/me/', user_profile_view, name='self_info'),
+    path('export/titles/', export_titles_view, name='export_titles'),
+    path('export/reviews/', export_reviews_view, name='export_reviews'),
+    path('search/', search_view, name='search'),
 ]
 urlpatterns += main_router.urls + reviews_router.urls + comments_router.urls
@@ -1,26 +1,46 @@
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import request as rq, status
-from rest_framework.decorators import permission_classes as perm_classes
+from rest_framework.decorators import action, permission_classes as perm_classes
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ViewSet
 
-from api.business_logic import send_code_to_user_and_save_it, user_already_has_review_on_title, \
+from api.autocomplete import title_name_index
+from api.business_logic import send_code_to_user_and_save_it, \
     get_code_if_email_was_sent_else_none, create_token_for_user_by_email, \
     check_data_contains_only_allowed_to_modify_fields
+from api.conditional_get import ConditionalGetMixin
 from api.decorators import allowed_http_methods
 from api.errors import EmailNotValid, BadRequest
+from api.export import iter_titles, iter_reviews
 from api.models import User, Title, Category, Genre, Review, Comment
+from api.pagination import OptionalCursorPagination
 from api.permissions import IsAdminElseReadOnly, IsAdminOrModeratorOrAuthorElseReadOnly, IsAdmin
-from api.search_filters import TitleFilter
+from api.response_cache import AnonymousResponseCacheMixin, TITLES, CATEGORIES, GENRES, USERS, \
+    title_reviews_resource, review_comments_resource
+from api.search import build_match_query, search_titles, search_reviews
+from api.search_filters import TitleFilter, StableOrderingFilter
 from api.serializers import ReviewSerializer, TitleSerializer, CommentSerializer, UserSerializer, CategorySerializer, \
-    GenreSerializer
+    GenreSerializer, SearchReviewSerializer
+from api.write_queue import QueuedWritesMixin
 
 
-class CategoryView(ModelViewSet):
+def get_limit(request, default=10, maximum=50):
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    return min(max(limit, 1), maximum)
+
+
+class CategoryView(QueuedWritesMixin, AnonymousResponseCacheMixin, ModelViewSet):
     serializer_class = CategorySerializer
+    cache_resources = (CATEGORIES,)
     queryset = Category.objects.all()
     filter_backends = [SearchFilter]
     search_fields = ['name']
@@ -34,8 +54,9 @@ class CategoryView(ModelViewSet):
         pass
 
 
-class GenreView(ModelViewSet):
+class GenreView(QueuedWritesMixin, AnonymousResponseCacheMixin, ModelViewSet):
     serializer_class = GenreSerializer
+    cache_resources = (GENRES,)
     queryset = Genre.objects.all()
     lookup_field = 'slug'
     permission_classes = [IsAdminElseReadOnly]
@@ -49,12 +70,26 @@ class GenreView(ModelViewSet):
         pass
 
 
-class CommentView(ModelViewSet):
+class CommentView(QueuedWritesMixin, ConditionalGetMixin, ModelViewSet):
     serializer_class = CommentSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = [IsAdminOrModeratorOrAuthorElseReadOnly]
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(Review, id=self.kwargs.get('review_pk'))
+        return self._review
+
+    def get_etag_resources(self, instance=None):
+        # Comments embed author names and, with ?expand=review, the review
+        review_id = instance.review_id if instance is not None else self.get_review().pk
+        return review_comments_resource(review_id), USERS
+
     def get_queryset(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_pk')).comments.all()
+        comments = self.get_review().comments.select_related('author')
+        if CommentSerializer.review_expanded(self.request):
+            comments = comments.select_related('review__author')
+        return comments
 
     def get_object(self):
         requested_comment = get_object_or_404(Comment, id=self.kwargs.get('pk'))
@@ -63,24 +98,52 @@ class CommentView(ModelViewSet):
 
     def perform_create(self, serializer):
         author = self.request.user
-        review = get_object_or_404(Review, id=self.kwargs.get('review_pk'))
-        serializer.save(author=author, review=review)
+        serializer.save(author=author, review=self.get_review())
 
 
-class TitleView(ModelViewSet):
+class TitleView(QueuedWritesMixin, AnonymousResponseCacheMixin, ConditionalGetMixin, ModelViewSet):
     serializer_class = TitleSerializer
+    cache_resources = (TITLES, CATEGORIES, GENRES)
+    etag_resources = (CATEGORIES, GENRES)
     permission_classes = [IsAdminElseReadOnly]
-    queryset = Title.objects.all()
-    filter_backends = [DjangoFilterBackend]
+    queryset = Title.objects.prefetch_related('genre')
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'name', 'id')
+    ordering = ('id',)
 
+    def get_etag_resources(self, instance=None):
+        if instance is None:
+            return TITLES, CATEGORIES, GENRES
+        return self.etag_resources
 
-class ReviewView(ModelViewSet):
+    @action(detail=False)
+    def autocomplete(self, request):
+        """Most reviewed titles whose name starts with ?q=, served from the in-memory name index"""
+        prefix = request.query_params.get('q', '').strip()
+        if not prefix:
+            raise BadRequest('q must not be empty')
+        matches = title_name_index.lookup(prefix, get_limit(request))
+        return Response([{'id': pk, 'name': name} for pk, name in matches])
+
+
+class ReviewView(QueuedWritesMixin, ConditionalGetMixin, ModelViewSet):
     serializer_class = ReviewSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = [IsAdminOrModeratorOrAuthorElseReadOnly]
 
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs.get('title_pk'))
+        return self._title
+
+    def get_etag_resources(self, instance=None):
+        if instance is not None:
+            return USERS,
+        return title_reviews_resource(self.get_title().pk), USERS
+
     def get_queryset(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_pk')).reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def get_object(self):
         requested_review = get_object_or_404(Review, id=self.kwargs.get('pk'))
@@ -90,10 +153,13 @@ class ReviewView(ModelViewSet):
     @perm_classes([IsAuthenticated])
     def perform_create(self, serializer):
         user = self.request.user
-        title = get_object_or_404(Title, id=self.kwargs.get('title_pk'))
-        if user_already_has_review_on_title(user, title):
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=user, title=title)
+        except IntegrityError:
+            # review_unique_title_author allows one review per user and title
             raise BadRequest
-        serializer.save(author=user, title=title)
 
 
 def get_user_email_and_send_code_to_it(request: rq):
@@ -111,7 +177,7 @@ def get_user_email_and_send_code_to_it(request: rq):
     return Response(data={'error_detail': 'Email not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserAdminView(ModelViewSet):
+class UserAdminView(QueuedWritesMixin, ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
     lookup_field = 'username'
@@ -131,12 +197,17 @@ class UserProfileView(ViewSet):
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'patch']
 
+    @staticmethod
+    def get_full_user(request):
+        # Authentication resolves a user with most fields deferred, profile needs all of them
+        return User.objects.get(pk=request.user.pk)
+
     def get_own_profile_info(self, request):
-        return Response(UserSerializer(request.user).data)
+        return Response(UserSerializer(self.get_full_user(request)).data)
 
     def change_own_profile_info(self, request):
         if check_data_contains_only_allowed_to_modify_fields(request.data):
-            user = request.user
+            user = self.get_full_user(request)
             for field_name, value in request.data.items():
                 setattr(user, field_name, value)
             user.save()
@@ -146,6 +217,45 @@ class UserProfileView(ViewSet):
             data={'error_detail': f'List of allowed fields is {User.ALLOWED_FIELDS_TO_FILL}'})
 
 
+class ExportView(ViewSet):
+    """NDJSON dumps for analytics, ?since= returns only rows updated at or after given ISO datetime"""
+    permission_classes = [IsAdmin]
+    http_method_names = ['get']
+    content_type = 'application/x-ndjson'
+
+    @staticmethod
+    def get_since(request):
+        since = request.query_params.get('since', None)
+        if since is None:
+            return None
+        parsed_since = parse_datetime(since)
+        if parsed_since is None:
+            raise BadRequest('since must be an ISO 8601 datetime')
+        return parsed_since
+
+    def export_titles(self, request):
+        return StreamingHttpResponse(iter_titles(self.get_since(request)), content_type=self.content_type)
+
+    def export_reviews(self, request):
+        return StreamingHttpResponse(iter_reviews(self.get_since(request)), content_type=self.content_type)
+
+
+class SearchView(ViewSet):
+    """Full text search over title names, descriptions and review texts, best matches first"""
+    http_method_names = ['get']
+
+    def list(self, request):
+        match_query = build_match_query(request.query_params.get('q', ''))
+        if match_query is None:
+            raise BadRequest('q must contain at least one word')
+        limit = get_limit(request)
+        context = {'request': request, 'view': self}
+        return Response({
+            'titles': TitleSerializer(search_titles(match_query, limit), many=True, context=context).data,
+            'reviews': SearchReviewSerializer(search_reviews(match_query, limit), many=True, context=context).data,
+        })
+
+
 def verify_user_code(request: rq):
     user_email = request.data.get('email', None)
     registration_confirmation_code = request.data.get('code', None)
@@ -0,0 +1,88 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction, close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    """Runs submitted writes on one writer thread, grouping whatever is queued into a single transaction
+
+    Every write gets its own savepoint, so a failing write is rolled back alone. Callers get the result
+    only after the batch is committed.
+    """
+
+    def __init__(self, max_batch_size=64):
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def run(self, func, *args, **kwargs):
+        if threading.current_thread() is self._thread:
+            return func(*args, **kwargs)
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future.result()
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            close_old_connections()
+            outcomes = []
+            try:
+                with transaction.atomic():
+                    for future, func, args, kwargs in batch:
+                        try:
+                            with transaction.atomic():
+                                outcomes.append((future, func(*args, **kwargs), None))
+                        except Exception as error:  # noqa: error belongs to the caller of this write
+                            outcomes.append((future, None, error))
+            except Exception as error:  # noqa: failed commit fails every write of the batch
+                logger.exception('Write batch of %s items failed', len(batch))
+                for future, *_ in batch:
+                    future.set_exception(error)
+                continue
+            for future, result, error in outcomes:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+
+write_queue = WriteQueue()
+
+
+class QueuedWritesMixin:
+    """Sends perform_create/update/destroy of a viewset through the write queue when it is enabled
+
+    Wrapping happens on the viewset instance, so perform_* overridden by the view itself are queued too.
+    """
+    QUEUED_METHODS = ('perform_create', 'perform_update', 'perform_destroy')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if settings.SQLITE_WRITE_QUEUE:
+            for name in self.QUEUED_METHODS:
+                setattr(self, name, partial(write_queue.run, getattr(self, name)))
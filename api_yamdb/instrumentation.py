@@ -0,0 +1,108 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api_yamdb.performance')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    MAX_CAPTURED_QUERIES = 200
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.queries = []
+        self.section_times = {}
+        self._section_depth = {}
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        if len(self.queries) < self.MAX_CAPTURED_QUERIES:
+            self.queries.append((sql, duration))
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - start)
+
+
+@contextmanager
+def timed(section):
+    """Adds time spent in the block to the current request metrics, nested blocks of one section count once"""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    depth = metrics._section_depth.get(section, 0)
+    metrics._section_depth[section] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._section_depth[section] = depth
+        if depth == 0:
+            metrics.section_times[section] = metrics.section_times.get(section, 0.0) + time.perf_counter() - start
+
+
+class PerformanceMiddleware:
+    """Measures sampled requests and reports them in api_yamdb.performance log and optional Server-Timing header"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PERFORMANCE_SAMPLE_RATE
+        self.slow_request_seconds = settings.PERFORMANCE_SLOW_REQUEST_MS / 1000
+        self.server_timing = settings.PERFORMANCE_SERVER_TIMING
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        total = time.perf_counter() - start
+        if self.server_timing:
+            response['Server-Timing'] = self.build_server_timing(metrics, total)
+        self.log(request, response, metrics, total)
+        return response
+
+    @staticmethod
+    def build_server_timing(metrics, total):
+        timings = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.query_count} queries"']
+        timings += [f'{section};dur={duration * 1000:.2f}' for section, duration in metrics.section_times.items()]
+        timings.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(timings)
+
+    def log(self, request, response, metrics, total):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'queries': metrics.query_count,
+        }
+        record.update({f'{section}_ms': round(duration * 1000, 2)
+                       for section, duration in metrics.section_times.items()})
+        if total < self.slow_request_seconds:
+            logger.info(json.dumps(record))
+            return
+        record['sql'] = [{'sql': sql, 'ms': round(duration * 1000, 2)} for sql, duration in metrics.queries]
+        logger.warning(json.dumps(record))
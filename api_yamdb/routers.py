@@ -0,0 +1,88 @@
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY_TEMPLATE = 'replica_sticky:{}'
+
+_routing_state = ContextVar('replica_routing_state', default=None)
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+
+
+@contextmanager
+def primary_reads():
+    """Routes reads inside the block to the default database
+
+    For data stored in caches under versions read from the primary, a lagging replica would pin stale rows
+    to the newer version.
+    """
+    token = _routing_state.set(RoutingState(use_replica=False))
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+class ReplicaRouter:
+    """Sends reads of safe requests to DATABASE_REPLICAS, everything else to the default database"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            # Reads after a write in the same request must see it
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Marks safe requests as replica readable, unless the client wrote within REPLICA_STICKY_SECONDS"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def get_sticky_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return STICKY_KEY_TEMPLATE.format(hashlib.md5(authorization.encode()).hexdigest())
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        sticky_key = self.get_sticky_key(request)
+        use_replica = request.method in SAFE_METHODS and not (sticky_key and cache.get(sticky_key))
+        token = _routing_state.set(RoutingState(use_replica))
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        if sticky_key and request.method not in SAFE_METHODS and response.status_code < 400:
+            cache.set(sticky_key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
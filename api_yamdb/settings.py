@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.instrumentation.PerformanceMiddleware',
+    'api_yamdb.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,7 +57,7 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly'
@@ -68,6 +70,9 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1)
 }
 
+# Seconds CachedJWTAuthentication keeps token user id, username, role and active status
+AUTH_USER_CACHE_TIMEOUT = 60
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -96,8 +101,77 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            # Seconds sqlite3 module waits for a lock before raising "database is locked"
+            'timeout': 20,
+        },
+    }
+}
+
+# Read only copies of default, e.g. 'replica': {'ENGINE': ..., 'NAME': ...} refreshed by refresh_sqlite_replica.
+# Aliases listed in DATABASE_REPLICAS serve reads of GET requests
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['api_yamdb.routers.ReplicaRouter']
+# Seconds a client that wrote keeps reading from default
+REPLICA_STICKY_SECONDS = 10
+
+# Applied to every new SQLite connection, see api_yamdb.sqlite.apply_sqlite_pragmas
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 20000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Funnel viewset writes through one writer thread that commits queued writes in shared transactions
+SQLITE_WRITE_QUEUE = False
+
+# Generation counters of the catalog, response and autocomplete caches live here, so every worker process must
+# share this cache, e.g. CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache and CACHE_LOCATION=cache_table
+# after manage.py createcachetable. The default LocMemCache is private to a process and fits single process runs only
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
+# Longest time a process keeps its catalog snapshot, bounds staleness if a version bump is missed
+CATALOG_CACHE_TIMEOUT = 30
+# Catalog caches trust their snapshot this long before reading the shared version counter again
+CATALOG_VERSION_CHECK_SECONDS = 1
+
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+# Full reload period of the title autocomplete index, picks up review counts changed by other processes
+AUTOCOMPLETE_REFRESH_SECONDS = 60 * 5
+
+# Share of requests measured by PerformanceMiddleware and duration after which captured SQL is logged
+PERFORMANCE_SAMPLE_RATE = 0.01
+PERFORMANCE_SLOW_REQUEST_MS = 500
+# Server-Timing header of measured requests, it shows query counts and timings to every client
+PERFORMANCE_SERVER_TIMING = DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api_yamdb.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -144,4 +218,8 @@ EMAIL_HOST_PASSWORD = 'onazsrnszzmuxsjg'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 
+EMAIL_CODE_LIFETIME = timedelta(days=1)
+# Share of issued codes that also delete expired ones
+EMAIL_CODE_PURGE_PROBABILITY = 0.01
+
 AUTH_USER_MODEL = 'api.User'
@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from collections import namedtuple
+from itertools import cycle
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+from api.models import Category, Genre, Title, Review, Comment, User
+
+REPORT_PATH = os.environ.get('QUERY_BUDGET_REPORT', 'query_budget_report.json')
+
+RouteCase = namedtuple('RouteCase', 'name method kwargs data budget')
+
+
+def iter_route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def seed_dataset(admin, titles=30, users=10, reviews_per_user=10, comments_per_review=2):
+    """Creates a catalog where list pages are full and every title has genres, reviews and comments"""
+    # bulk_create does not set primary keys on SQLite, so created rows are read back
+    Category.objects.bulk_create(Category(name=f'Category {i}', slug=f'category-{i}') for i in range(3))
+    categories = list(Category.objects.order_by('id'))
+    # Titles keep their category on delete, so deletions are measured on an unused one
+    spare_category = Category.objects.create(name='Spare', slug='spare')
+    Genre.objects.bulk_create(Genre(name=f'Genre {i}', slug=f'genre-{i}') for i in range(5))
+    genres = list(Genre.objects.order_by('id'))
+    category_cycle = cycle(categories)
+    Title.objects.bulk_create(
+        Title(name=f'Title {i}', year=1950 + i, description=f'Description {i}', category=next(category_cycle))
+        for i in range(titles))
+    created_titles = list(Title.objects.order_by('id'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genres[(title.id + shift) % len(genres)].id)
+        for title in created_titles for shift in range(2))
+    User.objects.bulk_create(User(username=f'reader{i}', email=f'reader{i}@yamdb.fake') for i in range(users))
+    authors = list(User.objects.filter(username__startswith='reader').order_by('id'))
+    Review.objects.bulk_create(
+        Review(title=created_titles[(i + j) % titles], author=author, text=f'Review {j}', score=(i + j) % 10 + 1)
+        for i, author in enumerate(authors + [admin]) for j in range(reviews_per_user))
+    reviews = list(Review.objects.order_by('id'))
+    Comment.objects.bulk_create(
+        Comment(review=review, author=authors[(review.id + k) % users], text=f'Comment {k}')
+        for review in reviews for k in range(comments_per_review))
+    Title.rebuild_ratings()
+    return {
+        'title_pk': reviews[-1].title_id,
+        'review_pk': reviews[-1].id,
+        'comment_pk': Comment.objects.filter(review=reviews[-1]).values_list('id', flat=True).first(),
+        'category': categories[0].slug,
+        'spare_category': spare_category.slug,
+        'genre': genres[0].slug,
+        'user': authors[0].username,
+    }
+
+
+def measure(client, case):
+    """Runs one request, streamed content included, and returns its report entry"""
+    path = reverse(case.name, kwargs=case.kwargs)
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = getattr(client, case.method.lower())(path, data=case.data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+    return {
+        'method': case.method,
+        'path': path,
+        'status': response.status_code,
+        'queries': len(context.captured_queries),
+        'budget': case.budget,
+        'time_ms': round(elapsed * 1000, 2),
+    }
+
+
+def write_report(results, path=REPORT_PATH):
+    with open(path, 'w') as report:
+        json.dump(results, report, indent=2, sort_keys=True)
+        report.write('\n')
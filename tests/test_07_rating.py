@@ -0,0 +1,102 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, IntegrityError
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Title, Review
+from .common import create_reviews
+
+
+class Test07Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_aggregates_follow_review_writes(self, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (12, 3, 4), \
+            'Title aggregates must be updated on review create'
+
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/', data={'score': 10})
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (17, 3, 5.67), \
+            'Title aggregates must be updated on review score change'
+
+        for review in Review.objects.filter(title=title):
+            review.delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (0, 0, None), \
+            'Title aggregates must be reset after all reviews are deleted'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (12, 3, 4), \
+            'rebuild_ratings must recalculate aggregates from reviews'
+        title = Title.objects.get(id=titles[1]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (0, 0, None), \
+            'rebuild_ratings must reset aggregates of titles without reviews'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_text_edit_skips_rating_update(self, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        updated_at = Title.objects.get(id=titles[0]['id']).updated_at
+        review = Review.objects.get(id=reviews[0]['id'])
+        review.text = 'typo fixed'
+        review.save()
+        assert Title.objects.get(id=titles[0]['id']).updated_at == updated_at, \
+            'Review save without score or title change must not change the title'
+        with CaptureQueriesContext(connection) as context:
+            review.save(update_fields=['text'])
+        assert not [query for query in context.captured_queries if 'api_title' in query['sql']], \
+            'Review save of other fields only must not touch titles'
+
+        review.score = 8
+        with CaptureQueriesContext(connection) as context:
+            review.save()
+        title_queries = [query['sql'] for query in context.captured_queries if 'api_title' in query['sql']]
+        assert len(title_queries) == 1 and '"name" =' not in title_queries[0], \
+            'Score change must update only the rating columns of the title'
+        assert Title.objects.get(id=titles[0]['id']).rating == 5, \
+            'Score change must be reflected in the title rating'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_duplicate_review_keeps_aggregates(self, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        response = user_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'again', 'score': 1})
+        assert response.status_code == 400, 'Second review of the same title must be rejected'
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (12, 3), \
+            'Rejected review must not change title aggregates'
+        with pytest.raises(IntegrityError):
+            Review.objects.create(title=title, author=admin, text='again', score=1)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_cascade_deletes_update_aggregates(self, user_client, admin):
+        _, titles, user, moderator = create_reviews(user_client, admin)
+        response = user_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (9, 2, 4.5), \
+            'Reviews deleted with their author must be removed from title aggregates'
+
+        Review.objects.filter(author=moderator).delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (5, 1, 5), \
+            'Queryset deletes must update title aggregates'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_stale_copies_keep_aggregates(self, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        first, second = Review.objects.get(id=reviews[0]['id']), Review.objects.get(id=reviews[0]['id'])
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        second.delete()
+        first.delete()
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.score_sum, title.review_count, title.rating) == (7, 2, 3.5), \
+            'Score deltas must come from the stored row, not from the values a copy was loaded with'
@@ -0,0 +1,106 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Category
+from .common import create_titles, create_comments
+
+
+class Test08QueryCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_query_count(self, client, user_client, django_assert_max_num_queries):
+        titles, _, _ = create_titles(user_client)
+        data = {key: value for key, value in titles[0].items() if key != 'id'}
+        for _ in range(3):
+            user_client.post('/api/v1/titles/', data=data)
+        with django_assert_max_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 5, \
+            'Title list must be served with a constant number of queries'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_query_count(self, client, user_client, django_assert_max_num_queries):
+        titles, _, _ = create_titles(user_client)
+        with django_assert_max_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_title_create_resolves_genres_without_queries(self, user_client):
+        _, categories, genres = create_titles(user_client)
+        data = {'name': 'Сборник', 'year': 2010, 'genre': [genre['slug'] for genre in genres],
+                'category': categories[0]['slug']}
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201
+        slug_selects = [query for query in context.captured_queries if '"slug" IN' in query['sql']]
+        assert not slug_selects, \
+            'Genre and category slugs of a title must be resolved from the catalog cache'
+
+        data['genre'] = ['horror', 'unknown', 'missing']
+        response = user_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400, \
+            'Unknown genre slugs must be reported as a validation error'
+        assert 'unknown, missing' in response.json()['genre'][0], \
+            'All unknown genre slugs must be reported together'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_catalog_cache_invalidation(self, client, user_client):
+        titles, _, _ = create_titles(user_client)
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        category.save()
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category']['name'] == 'Кино', \
+            'Category change must invalidate the catalog cache'
+        response = client.get('/api/v1/titles/', {'category': titles[0]['category']})
+        assert response.json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comment_list_query_count(self, client, user_client, admin, django_assert_max_num_queries):
+        comments, reviews, titles, _, _ = create_comments(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with django_assert_max_num_queries(3):
+            response = client.get(url)
+        assert [comment['review'] for comment in response.json()['results']] == [reviews[0]['id']] * len(comments), \
+            'Comments must carry only the review id by default'
+
+        with django_assert_max_num_queries(3):
+            response = client.get(url, {'expand': 'review'})
+        review = response.json()['results'][0]['review']
+        assert review['id'] == reviews[0]['id'] and review['author'] == reviews[0]['author'], \
+            'Comments must embed the review when ?expand=review is passed'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_catalog_cache_expires(self, user_client, settings):
+        settings.CATALOG_CACHE_TIMEOUT = 0
+        titles, _, _ = create_titles(user_client)
+        user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        # A queryset update sends no signals, like a change made by a process that does not share the counter
+        Category.objects.filter(slug=titles[0]['category']).update(name='Кино')
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['category']['name'] == 'Кино', \
+            'Catalog snapshot must be reloaded once CATALOG_CACHE_TIMEOUT has passed'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_shared_cache_queries_do_not_grow_with_rows(self, user_client, settings):
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                       'LOCATION': 'test_cache_table'}}
+        settings.CATALOG_VERSION_CHECK_SECONDS = 60
+        call_command('createcachetable')
+        titles, _, _ = create_titles(user_client)
+
+        def count_cache_queries():
+            with CaptureQueriesContext(connection) as context:
+                assert user_client.get('/api/v1/titles/').status_code == 200
+            return len([query for query in context.captured_queries if 'test_cache_table' in query['sql']])
+
+        few_titles = count_cache_queries()
+        data = {key: value for key, value in titles[0].items() if key != 'id'}
+        for _ in range(4):
+            user_client.post('/api/v1/titles/', data=data)
+        assert count_cache_queries() == few_titles, \
+            'Catalog slugs must not read the shared version counter once per row'
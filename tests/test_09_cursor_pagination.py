@@ -0,0 +1,38 @@
+import pytest
+
+from .common import create_reviews, create_comments
+
+
+class Test09CursorPagination:
+
+    @staticmethod
+    def collect_pages(client, url):
+        results = []
+        response = client.get(url, {'pagination': 'cursor', 'limit': 2})
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, 'Cursor pages must not count the whole table'
+            results += data['results']
+            if not data['next']:
+                return results
+            response = client.get(data['next'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor_pagination(self, client, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        results = self.collect_pages(client, f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert [review['id'] for review in results] == [review['id'] for review in reviews], \
+            'Cursor pagination must walk reviews by publication date without gaps'
+
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert response.json()['count'] == len(reviews), \
+            'Limit/offset pagination must stay the default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_cursor_pagination(self, client, user_client, admin):
+        comments, reviews, titles, _, _ = create_comments(user_client, admin)
+        results = self.collect_pages(
+            client, f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert [comment['id'] for comment in results] == [comment['id'] for comment in comments], \
+            'Cursor pagination must walk comments by publication date without gaps'
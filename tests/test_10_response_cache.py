@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles, create_reviews
+
+
+class Test10ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_anonymous_title_list_is_cached(self, client, user_client, django_assert_num_queries):
+        create_titles(user_client)
+        first = client.get('/api/v1/titles/', {'limit': 1})
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/', {'limit': 1})
+        assert first.json() == second.json(), \
+            'Cached anonymous response must match the computed one'
+        response = client.get('/api/v1/titles/', {'limit': 1, 'offset': 1})
+        assert response.json()['results'] != first.json()['results'], \
+            'Response cache key must include pagination parameters'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_writes_invalidate_cached_titles(self, client, user_client, admin):
+        titles, _, genres = create_titles(user_client)
+        url = f'/api/v1/titles/{titles[1]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        user_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'ok', 'score': 8})
+        assert client.get(url).json()['rating'] == 8, \
+            'Review with a new score must invalidate cached titles'
+
+        user_client.patch(url, data={'genre': [genres[0]['slug']]})
+        assert client.get(url).json()['genre'] == [genres[0]], \
+            'Title genre change must invalidate cached titles'
+
+        user_client.post('/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'})
+        assert 'western' in [genre['slug'] for genre in client.get('/api/v1/genres/').json()['results']], \
+            'New genre must invalidate cached genres'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_authenticated_requests_are_not_cached(self, user_client, admin):
+        create_reviews(user_client, admin)
+        user_client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert context.captured_queries, \
+            'Responses for authenticated users must not be served from the response cache'
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Category
+from .common import create_reviews, create_comments
+
+
+class Test11ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_detail_etag(self, client, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        etag = response['ETag']
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, 'Unchanged title must be answered with 304'
+
+        user_client.patch(f'{url}reviews/{reviews[0]["id"]}/', data={'score': 10})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, 'Rating change must change the title ETag'
+        assert response['ETag'] != etag
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_list_etag(self, client, user_client, admin):
+        reviews, titles, user, _ = create_reviews(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        assert not response.has_header('Last-Modified'), \
+            'Lists must not carry Last-Modified, deleting an older row does not change the newest updated_at'
+        etag = response['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, \
+            'Unchanged review list must be answered with 304'
+
+        user_client.delete(f'{url}{reviews[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, 'Deleting the oldest review must change the review list ETag'
+
+        etag = response['ETag']
+        user_client.patch(f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, \
+            'Author rename must change the review list ETag'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cursor_page_skips_aggregates(self, client, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/', {'pagination': 'cursor'})
+        assert response.status_code == 200
+        assert not [query for query in context.captured_queries
+                    if 'COUNT(' in query['sql'] or 'MAX(' in query['sql']], \
+            'Cursor pages must not count or scan the whole review list'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_expanded_comments_follow_review(self, client, user_client, admin):
+        _, reviews, titles, _, _ = create_comments(user_client, admin)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        url = f'{review_url}comments/?expand=review'
+        etag = client.get(url)['ETag']
+        user_client.patch(review_url, data={'text': 'new text', 'score': 1})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, 'Embedded review change must change the comment list ETag'
+        assert response.json()['results'][0]['review']['text'] == 'new text'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_comment_list_not_modified_skips_serialization(self, client, user_client, admin,
+                                                              django_assert_max_num_queries):
+        _, reviews, titles, _, _ = create_comments(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        etag = client.get(url)['ETag']
+        with django_assert_max_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_detail_follows_category_rename(self, client, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert not response.has_header('Last-Modified'), \
+            'Details must not carry Last-Modified, a category rename does not change the title updated_at'
+        etag = response['ETag']
+        category = Category.objects.get(slug=titles[0]['category'])
+        category.name = 'Кино'
+        category.save()
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        assert response.status_code == 200 and response.json()['category']['name'] == 'Кино', \
+            'Category rename must not be answered with 304 to If-Modified-Since'
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, \
+            'Category rename must change the title ETag'
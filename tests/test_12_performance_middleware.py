@@ -0,0 +1,47 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+from .common import create_comments
+
+
+class Test12PerformanceMiddleware:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing_header(self, settings, user_client, admin):
+        settings.PERFORMANCE_SAMPLE_RATE = 1.0
+        settings.PERFORMANCE_SERVER_TIMING = True
+        _, reviews, titles, _, _ = create_comments(user_client, admin)
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        timings = {entry.split(';')[0] for entry in response['Server-Timing'].split(', ')}
+        assert {'db', 'serializer', 'total'} <= timings, \
+            'Server-Timing header must report db, serializer and total time'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_slow_request_logs_sql(self, settings, caplog):
+        settings.PERFORMANCE_SAMPLE_RATE = 1.0
+        settings.PERFORMANCE_SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.INFO, logger='api_yamdb.performance'):
+            APIClient().get('/api/v1/titles/')
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == '/api/v1/titles/' and record['queries'] == len(record['sql']), \
+            'Slow requests must be logged with the captured SQL'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unsampled_request(self, settings):
+        settings.PERFORMANCE_SAMPLE_RATE = 0
+        response = APIClient().get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing'), \
+            'Requests outside of the sample must not be measured'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_server_timing_disabled(self, settings, caplog):
+        settings.PERFORMANCE_SAMPLE_RATE = 1.0
+        settings.PERFORMANCE_SERVER_TIMING = False
+        with caplog.at_level(logging.INFO, logger='api_yamdb.performance'):
+            response = APIClient().get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing'), \
+            'Query counts must not be sent to clients unless PERFORMANCE_SERVER_TIMING is on'
+        assert json.loads(caplog.records[-1].getMessage())['path'] == '/api/v1/titles/'
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from api.business_logic import send_code_to_user_and_save_it, get_code_if_email_was_sent_else_none
+from api.models import OutgoingEmail, EmailCode
+from api.outbox import send_due_emails, enqueue_email, get_due_emails, claim_due_emails
+from api_yamdb.routers import ReplicaRoutingMiddleware
+
+
+class Test13EmailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_registration_email_is_queued(self):
+        send_code_to_user_and_save_it('new@yamdb.fake')
+        assert not mail.outbox, 'Registration code must be queued instead of sent inline'
+        email = OutgoingEmail.objects.get(recipient='new@yamdb.fake')
+        assert EmailCode.objects.get(email='new@yamdb.fake').code in email.body
+
+        call_command('send_outbox', '--once')
+        assert len(mail.outbox) == 1 and mail.outbox[0].to == ['new@yamdb.fake'], \
+            'send_outbox must deliver queued emails'
+        assert OutgoingEmail.objects.get(pk=email.pk).sent_at is not None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_email_is_retried_later(self):
+        send_code_to_user_and_save_it('retry@yamdb.fake')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError):
+            assert send_due_emails() == (0, 1)
+        email = OutgoingEmail.objects.get(recipient='retry@yamdb.fake')
+        assert email.attempts == 1 and email.sent_at is None and 'OSError' in email.last_error
+        assert send_due_emails() == (0, 0), 'Failed email must wait for its backoff delay'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_email_code_upsert_and_expiry(self):
+        send_code_to_user_and_save_it('code@yamdb.fake')
+        send_code_to_user_and_save_it('code@yamdb.fake')
+        assert EmailCode.objects.filter(email='code@yamdb.fake').count() == 1, \
+            'Repeated code request must replace the code of the email'
+        code = EmailCode.objects.get(email='code@yamdb.fake').code
+        assert get_code_if_email_was_sent_else_none('code@yamdb.fake') == code
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT CAST(sent_at AS TEXT) FROM api_emailcode')
+            raw_sent_at, = cursor.fetchone()
+        expected = connection.ops.adapt_datetimefield_value(EmailCode.objects.get().sent_at)
+        assert raw_sent_at == expected, \
+            'Upserted sent_at must be stored in the format the ORM writes, values are compared as strings'
+
+        EmailCode.objects.update(sent_at=timezone.now() - settings.EMAIL_CODE_LIFETIME - timedelta(seconds=1))
+        assert get_code_if_email_was_sent_else_none('code@yamdb.fake') is None, \
+            'Expired code must not be accepted'
+        call_command('purge_email_codes')
+        assert not EmailCode.objects.exists(), 'purge_email_codes must delete expired codes'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_email_code_upsert_writes_to_default(self, settings):
+        # No such database alias, a write routed to it fails
+        settings.DATABASE_REPLICAS = ['replica']
+
+        def get_response(request):
+            EmailCode.objects.upsert('get@yamdb.fake', 'code')
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(RequestFactory().get('/api/v1/auth/email/'))
+        assert EmailCode.objects.get(email='get@yamdb.fake').code == 'code', \
+            'Upsert must use the write database even inside a safe request'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_workers_do_not_share_emails(self):
+        for i in range(3):
+            enqueue_email('Code', 'body', 'from@yamdb.fake', f'to{i}@yamdb.fake')
+        # Worker B read the due emails just before worker A claimed them
+        read_by_other_worker = get_due_emails(10)
+        claimed = claim_due_emails(2)
+        with mock.patch('api.outbox.get_due_emails', return_value=read_by_other_worker):
+            claimed_by_other_worker = claim_due_emails(10)
+        assert len(claimed) == 2 and len(claimed_by_other_worker) == 1, \
+            'Email claimed by one worker must be skipped by the others'
+        assert not {email.pk for email in claimed} & {email.pk for email in claimed_by_other_worker}
+        assert send_due_emails() == (0, 0), 'Claimed emails must not be due again before CLAIM_TIMEOUT'
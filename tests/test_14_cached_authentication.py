@@ -0,0 +1,49 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import USER_CACHE_KEY_TEMPLATE, CACHED_USER_FIELDS
+from .common import auth_client, create_users_api
+
+
+class Test14CachedAuthentication:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_user_is_cached(self, user_client):
+        user_client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post('/api/v1/categories/', data={'name': 'Игры', 'slug': 'games'})
+        assert response.status_code == 201
+        assert not [query for query in context.captured_queries if 'FROM "api_user"' in query['sql']], \
+            'Authenticated request must resolve the token user from cache'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_invalidates_cached_user(self, user_client):
+        user, _ = create_users_api(user_client)
+        client = auth_client(user)
+        data = {'name': 'Игры', 'slug': 'games'}
+        assert client.post('/api/v1/categories/', data=data).status_code == 403
+        user.role = user.ADMIN
+        user.save()
+        assert client.post('/api/v1/categories/', data=data).status_code == 201, \
+            'Role change must be visible to the next request of the user'
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401, \
+            'Deactivated user must not be authenticated'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_user_cached_before_commit_is_dropped(self, user_client):
+        user, _ = create_users_api(user_client)
+        client = auth_client(user)
+        data = {'name': 'Игры', 'slug': 'games'}
+        assert client.post('/api/v1/categories/', data=data).status_code == 403
+        stale_values = tuple(getattr(user, name) for name in CACHED_USER_FIELDS)
+        with transaction.atomic():
+            user.role = user.ADMIN
+            user.save()
+            # A concurrent request still sees the committed row and caches it again
+            cache.set(USER_CACHE_KEY_TEMPLATE.format(user.pk), stale_values)
+        assert client.post('/api/v1/categories/', data=data).status_code == 201, \
+            'User cached between the change and its commit must be dropped on commit'
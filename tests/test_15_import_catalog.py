@@ -0,0 +1,75 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.models import Title, Review, Comment, User
+
+
+def write(directory, name, content):
+    (directory / name).write_text(content, encoding='utf-8')
+
+
+class Test15ImportCatalog:
+
+    @pytest.fixture
+    def source(self, tmp_path):
+        write(tmp_path, 'category.csv', 'id,name,slug\n1,Фильм,films\n2,Книга,books\n')
+        write(tmp_path, 'genre.jsonl', '{"id": 1, "name": "Драма", "slug": "drama"}\n'
+                                       '{"id": 2, "name": "Комедия", "slug": "comedy"}\n')
+        write(tmp_path, 'users.csv', 'id,username,email,role,bio,first_name,last_name\n'
+                                     '100,reader,reader@yamdb.fake,user,,,\n'
+                                     '101,critic,critic@yamdb.fake,moderator,,,\n')
+        write(tmp_path, 'titles.csv', 'id,name,year,category\n'
+                                      '1,Проект,2020,1\n2,Поворот,2000,2\n3,Сборник,1990,2\n')
+        write(tmp_path, 'genre_title.csv', 'id,title_id,genre_id\n1,1,1\n2,1,2\n3,2,2\n')
+        write(tmp_path, 'review.csv', 'id,title_id,text,author,score,pub_date\n'
+                                      '1,1,Хорошо,100,8,2019-09-24T21:08:21.567Z\n'
+                                      '2,1,Плохо,101,3,2019-09-25T21:08:21.567Z\n')
+        write(tmp_path, 'comments.csv', 'id,review_id,text,author,pub_date\n'
+                                        '1,1,Согласен,101,2019-09-26T21:08:21.567Z\n')
+        return tmp_path
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_catalog(self, source):
+        call_command('import_catalog', str(source), '--batch-size', '2')
+        title = Title.objects.get(id=1)
+        assert sorted(title.genre.values_list('slug', flat=True)) == ['comedy', 'drama']
+        assert (title.review_count, title.rating) == (2, 5.5), 'Ratings must be rebuilt after import'
+        assert User.objects.get(id=101).is_moderator
+        assert Comment.objects.get(id=1).pub_date.day == 26, 'Imported comments must keep their date'
+        assert not (source / '.import_catalog_progress.json').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_import_resumes_after_failure(self, source):
+        write(source, 'review.csv', 'id,title_id,text,author,score\n1,1,Хорошо,100,8\n2,1,Плохо,999,3\n')
+        with pytest.raises(Exception):
+            call_command('import_catalog', str(source), '--batch-size', '1')
+        assert (source / '.import_catalog_progress.json').exists()
+        assert Review.objects.count() == 1
+
+        write(source, 'review.csv', 'id,title_id,text,author,score\n1,1,Хорошо,100,8\n2,1,Плохо,101,3\n')
+        call_command('import_catalog', str(source), '--batch-size', '1')
+        assert Review.objects.count() == 2
+        assert Title.objects.get(id=1).rating == 5.5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_import_reports_conflicts(self, source):
+        write(source, 'review.csv', 'id,title_id,text,author,score\n1,1,Хорошо,100,8\n2,1,Снова,100,3\n')
+        with pytest.raises(CommandError, match='review: rows 1-2'):
+            call_command('import_catalog', str(source), '--batch-size', '2')
+        assert Review.objects.count() == 0, 'Rows breaking a unique constraint must fail the batch, not vanish'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_resumed_batch_counts_inserted_rows(self, source):
+        call_command('import_catalog', str(source), '--batch-size', '1')
+        # Progress of the last review batch was lost, the resumed run repeats it
+        progress = {'category': 2, 'genre': 2, 'users': 2, 'titles': 3, 'genre_title': 3, 'review': 1, 'comments': 1}
+        (source / '.import_catalog_progress.json').write_text(json.dumps(progress))
+        output = StringIO()
+        call_command('import_catalog', str(source), '--batch-size', '1', stdout=output)
+        assert 'review: 0 rows' in output.getvalue() and '2 already imported' in output.getvalue(), \
+            'Rows of the repeated batch that were already in the database must not count as imported'
+        assert Review.objects.count() == 2
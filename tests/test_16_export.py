@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from django.utils import timezone
+
+from api.export import TITLE_EXPORT_FIELDS, REVIEW_EXPORT_FIELDS, _changed_since
+from api.models import Title, Review
+from .common import create_reviews, auth_client
+
+
+def read_lines(response):
+    return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+
+class Test16Export:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_titles_and_reviews(self, client, user_client, admin):
+        reviews, titles, user, _ = create_reviews(user_client, admin)
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        assert auth_client(user).get('/api/v1/export/titles/').status_code == 403, \
+            'Export must be available only for admins'
+
+        response = user_client.get('/api/v1/export/titles/')
+        assert response['Content-Type'] == 'application/x-ndjson'
+        exported = {row['id']: row for row in read_lines(response)}
+        assert exported[titles[0]['id']]['genre'] == titles[0]['genre']
+        assert exported[titles[0]['id']]['category'] == titles[0]['category']
+        assert exported[titles[0]['id']]['rating'] == 4
+
+        exported = read_lines(user_client.get('/api/v1/export/reviews/'))
+        assert [row['id'] for row in exported] == [review['id'] for review in reviews]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_since(self, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        exported = read_lines(user_client.get('/api/v1/export/reviews/'))
+        since = exported[-1]['updated_at']
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/', data={'text': 'new'})
+        exported = read_lines(user_client.get('/api/v1/export/reviews/', {'since': since}))
+        assert exported[-1]['id'] == reviews[0]['id'] and exported[-1]['text'] == 'new', \
+            'Incremental export must return rows changed since the given time'
+        assert reviews[1]['id'] not in [row['id'] for row in exported]
+        assert user_client.get('/api/v1/export/reviews/', {'since': 'yesterday'}).status_code == 400
+
+    @pytest.mark.django_db
+    def test_03_export_streams_in_index_order(self):
+        for model, fields in ((Title, TITLE_EXPORT_FIELDS), (Review, REVIEW_EXPORT_FIELDS)):
+            for since in (None, timezone.now()):
+                plan = _changed_since(model.objects.values(*fields), since).explain()
+                assert 'TEMP B-TREE' not in plan, \
+                    f'{model.__name__} export must read rows in (updated_at, id) index order, plan: {plan}'
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from api.models import Category, Title, Review
+from api.views import ReviewView
+from api.write_queue import write_queue
+from .common import create_titles, create_users_api, auth_client
+
+
+class Test17WriteQueue:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_writes_run_on_writer_thread(self):
+        def create_category(slug):
+            Category.objects.create(name=slug, slug=slug)
+            return threading.current_thread().name
+
+        def fail():
+            Category.objects.create(name='broken', slug='broken')
+            raise ValueError
+
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(write_queue.run(create_category, f'c{i}')))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        with pytest.raises(ValueError):
+            write_queue.run(fail)
+        for thread in threads:
+            thread.join()
+        assert set(results) == {'sqlite-writer'}
+        assert Category.objects.filter(slug__startswith='c').count() == 8
+        assert not Category.objects.filter(slug='broken').exists(), \
+            'Failed write must be rolled back without affecting the rest of the batch'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_viewset_writes_go_through_queue(self, settings, user_client, monkeypatch):
+        settings.SQLITE_WRITE_QUEUE = True
+        write_threads = []
+        perform_create = ReviewView.perform_create
+
+        def recording_perform_create(view, serializer):
+            write_threads.append(threading.current_thread().name)
+            return perform_create(view, serializer)
+
+        monkeypatch.setattr(ReviewView, 'perform_create', recording_perform_create)
+        titles, _, _ = create_titles(user_client)
+        user, moderator = create_users_api(user_client)
+        responses = []
+        threads = [threading.Thread(target=lambda client=client: responses.append(client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'ok', 'score': 6})))
+            for client in (user_client, auth_client(user), auth_client(moderator))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [response.status_code for response in responses] == [201] * 3
+        assert Review.objects.count() == 3
+        assert Title.objects.get(id=titles[0]['id']).rating == 6
+        assert write_threads == ['sqlite-writer'] * 3, 'Viewset perform_create must run on the writer thread'
@@ -0,0 +1,102 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api.models import Title
+from .common import create_titles, create_users_api, auth_client
+from api_yamdb.routers import ReplicaRouter, ReplicaRoutingMiddleware, primary_reads
+
+
+def route(method, status=200, write=False, primary=False, **extra):
+    seen = {}
+
+    def get_response(request):
+        router = ReplicaRouter()
+        if primary:
+            with primary_reads():
+                seen['primary'] = router.db_for_read(Title)
+        seen['before'] = router.db_for_read(Title)
+        if write:
+            router.db_for_write(Title)
+        seen['after'] = router.db_for_read(Title)
+        return HttpResponse(status=status)
+
+    request = getattr(RequestFactory(), method)('/api/v1/titles/', **extra)
+    ReplicaRoutingMiddleware(get_response)(request)
+    return seen
+
+
+class Test18ReplicaRouting:
+
+    def test_01_safe_requests_read_from_replica(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        assert route('get') == {'before': 'replica', 'after': 'replica'}
+        assert route('post') == {'before': 'default', 'after': 'default'}
+        assert route('get', write=True) == {'before': 'replica', 'after': 'default'}, \
+            'Reads after a write in the same request must use the default database'
+        assert ReplicaRouter().db_for_read(Title) == 'default', \
+            'Reads outside of a request must use the default database'
+
+    def test_02_writer_sticks_to_default(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        cache.clear()
+        author = {'HTTP_AUTHORIZATION': 'Bearer author'}
+        route('post', status=400, **author)
+        assert route('get', **author)['before'] == 'replica', 'Failed writes must not pin the client'
+        route('post', **author)
+        assert route('get', **author)['before'] == 'default', \
+            'Client that wrote must read from the default database during REPLICA_STICKY_SECONDS'
+        assert route('get', HTTP_AUTHORIZATION='Bearer other')['before'] == 'replica'
+
+    def test_03_no_replicas(self, settings):
+        settings.DATABASE_REPLICAS = []
+        assert route('get') == {'before': 'default', 'after': 'default'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_works_with_router(self, client):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+
+    def test_05_primary_reads(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        assert route('get', primary=True) == {'primary': 'default', 'before': 'replica', 'after': 'replica'}, \
+            'Only reads inside primary_reads must use the default database'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_cache_loaders_read_from_default(self, client, settings):
+        # No such database alias, any read routed to it fails
+        settings.DATABASE_REPLICAS = ['replica']
+        assert client.get('/api/v1/titles/').status_code == 200, \
+            'Response and catalog caches must be filled from the default database'
+        assert client.get('/api/v1/titles/autocomplete/', {'q': 'a'}).status_code == 200, \
+            'Autocomplete index must be loaded from the default database'
+
+    @pytest.fixture
+    def replica(self, settings, tmp_path):
+        connections.databases['replica'] = {
+            **connections['default'].settings_dict, 'NAME': str(tmp_path / 'replica.sqlite3')}
+        settings.DATABASE_REPLICAS = ['replica']
+        yield 'replica'
+        connections['replica'].close()
+        del connections.databases['replica']
+        delattr(connections._connections, 'replica')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_reads_from_refreshed_replica(self, user_client, replica):
+        titles, _, _ = create_titles(user_client)
+        user, _ = create_users_api(user_client)
+        reader = auth_client(user)
+        call_command('refresh_sqlite_replica')
+        data = {key: value for key, value in titles[0].items() if key != 'id'}
+        assert user_client.post('/api/v1/titles/', data=data).status_code == 201
+
+        assert reader.get('/api/v1/titles/').json()['count'] == 2, \
+            'GET requests must read the rows copied to the replica'
+        assert user_client.get('/api/v1/titles/').json()['count'] == 3, \
+            'Client that wrote must keep reading from the default database'
+        call_command('refresh_sqlite_replica')
+        assert reader.get('/api/v1/titles/').json()['count'] == 3, \
+            'refresh_sqlite_replica must copy new rows to the replica'
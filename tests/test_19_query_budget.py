@@ -0,0 +1,55 @@
+import pytest
+
+import api.urls
+from .query_budget import RouteCase, iter_route_names, seed_dataset, measure, write_report
+
+# Plain Django views, request.data used by them is only available in DRF views
+UNMEASURED_ROUTES = {'get_user_email_and_send_code_to_it', 'verify_user_code'}
+
+
+def build_cases(ids):
+    title = {'pk': ids['title_pk']}
+    review = {'title_pk': ids['title_pk'], 'pk': ids['review_pk']}
+    comments = {'title_pk': ids['title_pk'], 'review_pk': ids['review_pk']}
+    new_title = {'name': 'New', 'year': 2000, 'genre': [ids['genre']], 'category': ids['category']}
+    # Cases run in order on fresh caches, the first one also loads the user and the catalog
+    return [
+        RouteCase('titles-list', 'GET', {}, None, 5),
+        RouteCase('titles-list', 'POST', {}, new_title, 7),
+        RouteCase('titles-autocomplete', 'GET', {}, {'q': 'title 1'}, 1),
+        RouteCase('titles-detail', 'GET', title, None, 2),
+        RouteCase('titles-detail', 'PATCH', title, {'description': 'Changed'}, 4),
+        RouteCase('reviews-list', 'GET', {'title_pk': ids['title_pk']}, None, 3),
+        RouteCase('reviews-detail', 'GET', review, None, 2),
+        RouteCase('reviews-detail', 'PATCH', review, {'score': 7}, 5),
+        RouteCase('comments-list', 'GET', comments, None, 3),
+        RouteCase('comments-list', 'POST', comments, {'text': 'New comment'}, 2),
+        RouteCase('comments-detail', 'GET', {**comments, 'pk': ids['comment_pk']}, None, 2),
+        RouteCase('categories-list', 'GET', {}, None, 2),
+        RouteCase('categories-detail', 'DELETE', {'slug': ids['spare_category']}, None, 3),
+        RouteCase('genres-list', 'GET', {}, None, 2),
+        RouteCase('genres-detail', 'DELETE', {'slug': ids['genre']}, None, 4),
+        RouteCase('users-list', 'GET', {}, None, 2),
+        RouteCase('users-detail', 'GET', {'username': ids['user']}, None, 1),
+        RouteCase('self_info', 'GET', {}, None, 1),
+        RouteCase('export_titles', 'GET', {}, None, 3),
+        RouteCase('export_reviews', 'GET', {}, None, 1),
+        RouteCase('search', 'GET', {}, {'q': '1'}, 5),
+    ]
+
+
+class Test19QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_every_route_within_budget(self, admin, user_client):
+        cases = build_cases(seed_dataset(admin))
+        missing = set(iter_route_names(api.urls.urlpatterns)) - UNMEASURED_ROUTES - {case.name for case in cases}
+        assert not missing, f'Routes without a query budget: {sorted(missing)}'
+
+        results = {f'{case.method} {case.name}': measure(user_client, case) for case in cases}
+        write_report(results)
+        failed = [f'{key}: status {result["status"]}' for key, result in results.items() if result['status'] >= 400]
+        over_budget = [f'{key}: {result["queries"]} queries, budget {result["budget"]}'
+                       for key, result in results.items() if result['queries'] > result['budget']]
+        assert not failed, f'Requests failed: {failed}'
+        assert not over_budget, f'Routes over their query budget: {over_budget}'
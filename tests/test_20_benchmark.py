@@ -0,0 +1,42 @@
+import json
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command, CommandError
+from django.db.models import Count
+
+from api.models import Title, Review, Comment
+from api.management.commands.seed_benchmark_data import zipf_counts
+
+
+class Test20Benchmark:
+
+    def test_01_zipf_counts(self):
+        counts = sorted(zipf_counts(1000, 100, 1.1, random.Random(0)), reverse=True)
+        assert counts[0] > 10 * counts[50], 'Counts must have a long tail'
+        assert abs(sum(counts) - 1000) < 50
+        assert max(zipf_counts(1000, 100, 1.1, random.Random(0), cap=20)) == 20
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_seed_and_compare_with_baseline(self, tmp_path):
+        call_command('seed_benchmark_data', scale=0.1, stdout=StringIO())
+        assert Title.objects.count() == 50
+        assert Review.objects.count() > 100 and Comment.objects.count() > 100
+        assert not Review.objects.values('title', 'author').annotate(n=Count('id')).filter(n__gt=1).exists(), \
+            'Generated reviews must respect one review per user and title'
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == title.reviews.count(), 'Ratings must be rebuilt after seeding'
+
+        baseline = tmp_path / 'baseline.json'
+        call_command('benchmark_api', iterations=3, warmup=1, baseline=str(baseline), save_baseline=True,
+                     stdout=StringIO())
+        results = json.loads(baseline.read_text())
+        assert {'p50_ms', 'p95_ms', 'p99_ms', 'queries'} <= set(results['titles-list'])
+        assert results['titles-list anonymous']['queries'] == 0
+
+        results['titles-list']['queries'] -= 1
+        baseline.write_text(json.dumps(results))
+        with pytest.raises(CommandError, match='titles-list: 3.0 queries per call'):
+            call_command('benchmark_api', iterations=3, warmup=1, baseline=str(baseline), tolerance=1000,
+                         stdout=StringIO())
@@ -0,0 +1,37 @@
+import pytest
+
+from api.models import Review
+from .common import create_reviews
+
+
+class Test21Search:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_titles_and_reviews(self, client, user_client, admin):
+        reviews, titles, _, _ = create_reviews(user_client, admin)
+        response = client.get('/api/v1/search/', {'q': 'ПОВО'})
+        assert response.status_code == 200
+        assert [title['id'] for title in response.json()['titles']] == [titles[0]['id']], \
+            'Search must be case insensitive and match the last word as a prefix'
+
+        response = client.get('/api/v1/search/', {'q': 'qwerty'})
+        assert {review['id'] for review in response.json()['reviews']} == {review['id'] for review in reviews}
+        assert response.json()['reviews'][0]['title'] == titles[0]['id']
+
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'description': 'Проект века'})
+        response = client.get('/api/v1/search/', {'q': 'проект'})
+        assert [title['id'] for title in response.json()['titles']] == [titles[1]['id'], titles[0]['id']], \
+            'Name matches must rank above description matches and updates must be indexed'
+
+        Review.objects.get(id=reviews[0]['id']).delete()
+        Review.objects.filter(id=reviews[1]['id']).update(text='changed')
+        response = client.get('/api/v1/search/', {'q': 'qwerty', 'limit': 5})
+        assert [review['id'] for review in response.json()['reviews']] == [reviews[2]['id']], \
+            'Deleted and updated reviews must leave the index'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_requires_words(self, client):
+        assert client.get('/api/v1/search/').status_code == 400
+        assert client.get('/api/v1/search/', {'q': '"*:('}).status_code == 400
+        response = client.get('/api/v1/search/', {'q': 'AND OR "x'})
+        assert response.status_code == 200, 'FTS syntax in user input must be escaped'
@@ -0,0 +1,58 @@
+import pytest
+
+from api.autocomplete import title_name_index
+from api.models import Title
+from .common import create_reviews, auth_client
+
+
+def autocomplete(client, q, **params):
+    response = client.get('/api/v1/titles/autocomplete/', {'q': q, **params})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()]
+
+
+class Test22Autocomplete:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_prefix_ranked_by_reviews(self, client, user_client, admin, django_assert_num_queries):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        assert autocomplete(client, 'п') == ['Поворот туда', 'Проект'], \
+            'Titles must be ranked by review count'
+        assert autocomplete(client, 'ПРО') == ['Проект'], 'Prefix match must be case insensitive'
+        assert autocomplete(client, 'п', limit=1) == ['Поворот туда']
+        assert client.get('/api/v1/titles/autocomplete/').status_code == 400
+
+        user_client.post('/api/v1/titles/', data={'name': 'Прометей', 'year': 2012, 'category': 'films'})
+        user_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Поворот обратно'})
+        Title.objects.get(id=titles[1]['id']).delete()
+        with django_assert_num_queries(0):
+            names = autocomplete(client, 'п')
+        assert names == ['Поворот обратно', 'Прометей'], \
+            'Local title changes must be patched into the index without reloading it'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_counts_refresh(self, client, user_client, admin, django_assert_num_queries):
+        _, titles, user, moderator = create_reviews(user_client, admin)
+        assert autocomplete(client, 'п') == ['Поворот туда', 'Проект']
+        for author_client in (user_client, auth_client(user), auth_client(moderator)):
+            author_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Да', 'score': 5})
+        Title.objects.get(id=titles[0]['id']).reviews.first().delete()
+        with django_assert_num_queries(0):
+            names = autocomplete(client, 'п')
+        assert names == ['Проект', 'Поворот туда'], \
+            'Review count changes must be patched into the index on commit'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reload_in_background(self, client, user_client, admin, django_assert_num_queries):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        assert autocomplete(client, 'п') == ['Поворот туда', 'Проект']
+        # A queryset update sends no signals, like a change made in another process that bumps the generation
+        Title.objects.filter(id=titles[1]['id']).update(name='Пролог')
+        title_name_index.invalidate()
+        with django_assert_num_queries(0):
+            names = autocomplete(client, 'п')
+        assert names == ['Поворот туда', 'Проект'], \
+            'Lookups must keep answering from the loaded index while it reloads'
+        title_name_index._reload_thread.join()
+        assert autocomplete(client, 'п') == ['Поворот туда', 'Пролог'], \
+            'Index must be reloaded in the background after a change from another process'
@@ -0,0 +1,39 @@
+import pytest
+
+from .common import create_reviews
+
+
+def filtered_ids(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data['count'] == len(data['results']), 'Filtered titles must not be duplicated'
+    return sorted(title['id'] for title in data['results'])
+
+
+class Test23TitleFilters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_multi_genre_and_ranges(self, client, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        genres = [title['genre'] for title in titles]
+        g0, g1, g2 = genres[0][0], genres[0][1], genres[1][0]
+        response = user_client.post('/api/v1/titles/', data={
+            'name': 'Третий', 'year': 2010, 'genre': [g0, g2], 'category': titles[0]['category']})
+        third = response.json()['id']
+        first, second = titles[0]['id'], titles[1]['id']
+
+        assert filtered_ids(client, genre=f'{g0},{g2}') == [first, second, third], \
+            'Comma separated genres must match titles with any of them'
+        assert filtered_ids(client, genre=f'{g0},{g2}', genre_mode='all') == [third], \
+            'genre_mode=all must match titles with all genres'
+        assert filtered_ids(client, genre=f'{g0},{g1}', genre_mode='all') == [first]
+        assert filtered_ids(client, genre=f'{g1},unknown') == [first]
+        assert filtered_ids(client, genre=f'{g1},unknown', genre_mode='all') == []
+        assert client.get('/api/v1/titles/', {'genre_mode': 'some'}).status_code == 400
+
+        assert filtered_ids(client, year__gte=2005, year__lte=2015) == [third]
+        assert filtered_ids(client, year__gte=2010) == [second, third]
+        assert filtered_ids(client, rating__gte=4) == [first]
+        assert filtered_ids(client, rating__lte=3.5) == []
+        assert filtered_ids(client, genre=g0, year__lte=2005, category=titles[0]['category']) == [first]
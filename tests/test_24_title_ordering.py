@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+
+from api.models import Title
+from .common import create_reviews
+
+
+def ordered_ids(client, ordering=None):
+    response = client.get('/api/v1/titles/', {'ordering': ordering} if ordering else {})
+    assert response.status_code == 200
+    return [title['id'] for title in response.json()['results']]
+
+
+class Test24TitleOrdering:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering_with_tie_breaker(self, client, user_client, admin):
+        _, titles, _, _ = create_reviews(user_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        third = user_client.post('/api/v1/titles/', data={
+            'name': 'Альфа', 'year': 2000, 'category': titles[0]['category']}).json()['id']
+
+        assert ordered_ids(client) == [first, second, third], 'Titles must be ordered by id by default'
+        assert ordered_ids(client, '-year') == [second, third, first], \
+            'Equal sort keys must keep the id order in the direction of the last key'
+        assert ordered_ids(client, 'year') == [first, third, second]
+        assert ordered_ids(client, '-year,name') == [second, third, first]
+        assert ordered_ids(client, 'name') == [third, first, second]
+        assert ordered_ids(client, '-rating') == [first, third, second], \
+            'Titles without rating must come after rated ones'
+        assert ordered_ids(client, 'score_sum') == [first, second, third], \
+            'Fields outside the whitelist must be ignored'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sorted_pages_walk_an_index(self):
+        queries = (
+            Title.objects.order_by('-rating', '-id'),
+            Title.objects.filter(category_id=1).order_by('-rating', '-id'),
+            Title.objects.filter(category_id=1).order_by('year', 'id'),
+            Title.objects.order_by('name', 'id'),
+        )
+        for queryset in queries:
+            sql, params = queryset[:10].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, \
+                f'Sorted title page must be read in index order, got plan: {plan}'
@@ -0,0 +1,21 @@
+import pytest
+from django.db import connections
+
+
+class Test25SqliteConnections:
+
+    @pytest.mark.django_db
+    def test_01_pragmas_reach_file_backed_connections(self, tmp_path):
+        settings_dict = {**connections['default'].settings_dict, 'NAME': str(tmp_path / 'pragmas.sqlite3')}
+        connection = connections['default'].__class__(settings_dict, alias='pragma_check')
+        try:
+            with connection.cursor() as cursor:
+                values = {}
+                for name in ('journal_mode', 'busy_timeout', 'synchronous'):
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+            assert values == {'journal_mode': 'wal', 'busy_timeout': 20000, 'synchronous': 1}, \
+                'SQLITE_PRAGMAS must be applied to every new connection'
+            assert connection.close_at is not None, 'CONN_MAX_AGE must keep connections open between requests'
+        finally:
+            connection.close()